@@ -7,6 +7,7 @@ Permite crear, editar, eliminar perfiles y configurar búsquedas automáticas pr
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
+from datetime import datetime
 from services.profile_service import ProfileService
 from services.email_search_service import EmailSearchService
 from services.config_service import ConfigService
@@ -30,6 +31,10 @@ class ProfileManager:
         self.scheduler_service = SchedulerService()
         self.current_active_profiles = []
         self.profile_items = {}
+        self.item_by_profile = {}
+
+        # Diálogo de perfil reutilizable (se construye en el primer uso)
+        self._profile_dialog = None
 
         # Para actualizaciones en tiempo real
         self.status_update_job = None
@@ -81,6 +86,17 @@ class ProfileManager:
         # Lista de perfiles
         self.create_profiles_list()
 
+        # Menú contextual (se construye una sola vez)
+        self.create_context_menu()
+
+    def create_context_menu(self):
+        """Crea el menú contextual para los perfiles"""
+        self._context_menu = tk.Menu(self.parent, tearoff=0)
+        self._context_menu.add_command(label="✏️ Editar", command=self.edit_selected_profile)
+        self._context_menu.add_command(label="🗑️ Eliminar", command=self.delete_selected_profile)
+        self._context_menu.add_separator()
+        self._context_menu.add_command(label="⚡ Activar/Desactivar", command=self.toggle_profile_status)
+
     def create_scheduler_status_area(self):
         """Crea el área de estado del programador automático"""
         # Frame de estado del programador
@@ -197,8 +213,9 @@ class ProfileManager:
             for item in self.profiles_tree.get_children():
                 self.profiles_tree.delete(item)
 
-            # Limpiar mapeo
+            # Limpiar mapeos
             self.profile_items.clear()
+            self.item_by_profile.clear()
 
             # Obtener perfiles y estadísticas
             profiles_stats = self.profile_service.get_all_profiles_stats()
@@ -207,37 +224,23 @@ class ProfileManager:
                 self.show_info("No hay perfiles creados", "info")
                 return
 
+            # Enlazar localmente los métodos usados en cada iteración
+            insert = self.profiles_tree.insert
+            format_row = self._format_profile_row
+            profile_items = self.profile_items
+            item_by_profile = self.item_by_profile
+
             # Agregar perfiles a la lista
             for profile_id, data in profiles_stats.items():
                 try:
-                    profile = data.get("profile", {})
-                    stats = data.get("stats", {})
-
-                    name = profile.get("name", "Sin nombre")
-                    search_title = profile.get("search_title", "Sin criterio")
-                    is_active = profile.get("is_active", True)
-                    status = "Activo" if is_active else "Inactivo"
-
-                    executions = stats.get("current_emails_found", stats.get("total_emails_found", 0))
-                    last_execution = stats.get("last_execution")
-
-                    # Formatear fecha de última ejecución
-                    if last_execution:
-                        try:
-                            from datetime import datetime
-                            last_exec_dt = datetime.fromisoformat(last_execution.replace('Z', '+00:00'))
-                            last_exec_str = last_exec_dt.strftime("%d/%m/%Y %H:%M")
-                        except Exception:
-                            last_exec_str = "Error fecha"
-                    else:
-                        last_exec_str = "Nunca"
+                    values = format_row(data.get("profile") or {}, data.get("stats") or {})
 
                     # Insertar en el tree
-                    item_id = self.profiles_tree.insert("", "end",
-                                                        values=(name, search_title, status, executions, last_exec_str))
+                    item_id = insert("", "end", values=values)
 
-                    # Mapear item_id a profile_id
-                    self.profile_items[item_id] = profile_id
+                    # Mapear item_id <-> profile_id
+                    profile_items[item_id] = profile_id
+                    item_by_profile[profile_id] = item_id
 
                 except Exception as e:
                     error_msg = self.clean_string(str(e))
@@ -250,6 +253,53 @@ class ProfileManager:
             error_msg = self.clean_string(str(e))
             self.show_info(f"Error actualizando lista de perfiles: {error_msg}", "error")
 
+    def _format_profile_row(self, profile, stats):
+        """
+        Construye los valores de una fila del Treeview
+
+        Args:
+            profile (dict): Datos del perfil
+            stats (dict): Estadísticas del perfil
+
+        Returns:
+            tuple: Valores de las columnas de la fila
+        """
+        pg = profile.get
+        sg = stats.get
+
+        status = "Activo" if pg("is_active", True) else "Inactivo"
+        executions = sg("current_emails_found", sg("total_emails_found", 0))
+        last_execution = sg("last_execution")
+
+        # Formatear fecha de última ejecución
+        if last_execution:
+            try:
+                last_exec_dt = datetime.fromisoformat(last_execution.replace('Z', '+00:00'))
+                last_exec_str = last_exec_dt.strftime("%d/%m/%Y %H:%M")
+            except Exception:
+                last_exec_str = "Error fecha"
+        else:
+            last_exec_str = "Nunca"
+
+        return (pg("name", "Sin nombre"), pg("search_title", "Sin criterio"), status, executions, last_exec_str)
+
+    def _update_row(self, profile_id):
+        """
+        Actualiza en el sitio la fila de un perfil sin reconstruir la lista
+
+        Args:
+            profile_id (str): ID del perfil a actualizar
+        """
+        item_id = self.item_by_profile.get(profile_id)
+        profile = self.profile_service.get_profile(profile_id)
+
+        if item_id is None or profile is None or not self.profiles_tree.exists(item_id):
+            self.refresh_profiles_list()
+            return
+
+        stats = self.profile_service.get_profile_stats(profile_id)
+        self.profiles_tree.item(item_id, values=self._format_profile_row(profile, stats))
+
     def start_scheduler_if_configured(self):
         """Inicia el programador si está configurado y habilitado"""
         try:
@@ -346,7 +396,6 @@ class ProfileManager:
             status = self.scheduler_service.get_scheduler_status()
 
             # Actualizar timestamp de última actualización
-            from datetime import datetime
             current_time = datetime.now().strftime("%H:%M:%S")
             self.last_update_label.config(text=f"Actualizado: {current_time}")
 
@@ -523,11 +572,16 @@ class ProfileManager:
         item_id = selected[0]
         return self.profile_items.get(item_id)
 
+    def get_profile_dialog(self):
+        """Obtiene el diálogo de perfil reutilizable, creándolo si no existe"""
+        if self._profile_dialog is None:
+            self._profile_dialog = ProfileDialog(self.parent)
+        return self._profile_dialog
+
     def create_new_profile(self):
         """Abre el diálogo para crear un nuevo perfil"""
         try:
-            dialog = ProfileDialog(self.parent, title="Nuevo Perfil")
-            result = dialog.show()
+            result = self.get_profile_dialog().show(title="Nuevo Perfil")
 
             if result:
                 name, search_title = result
@@ -567,9 +621,9 @@ class ProfileManager:
                 return
 
             # Mostrar diálogo de edición
-            dialog = ProfileDialog(self.parent, title="Editar Perfil",
-                                   name=profile["name"], search_title=profile["search_title"])
-            result = dialog.show()
+            result = self.get_profile_dialog().show(title="Editar Perfil",
+                                                    name=profile["name"],
+                                                    search_title=profile["search_title"])
 
             if result:
                 name, search_title = result
@@ -585,8 +639,8 @@ class ProfileManager:
                 # Actualizar perfil
                 self.profile_service.update_profile(profile_id, name=name.strip(), search_title=search_title.strip())
 
-                # Actualizar lista
-                self.refresh_profiles_list()
+                # Actualizar solo la fila editada
+                self._update_row(profile_id)
                 self.show_info(f"✓ Perfil '{name}' actualizado correctamente", "success")
 
         except Exception as e:
@@ -635,17 +689,10 @@ class ProfileManager:
         if item:
             self.profiles_tree.selection_set(item)
 
-            # Crear menú contextual
-            context_menu = tk.Menu(self.parent, tearoff=0)
-            context_menu.add_command(label="✏️ Editar", command=self.edit_selected_profile)
-            context_menu.add_command(label="🗑️ Eliminar", command=self.delete_selected_profile)
-            context_menu.add_separator()
-            context_menu.add_command(label="⚡ Activar/Desactivar", command=self.toggle_profile_status)
-
             try:
-                context_menu.tk_popup(event.x_root, event.y_root)
+                self._context_menu.tk_popup(event.x_root, event.y_root)
             finally:
-                context_menu.grab_release()
+                self._context_menu.grab_release()
 
     def toggle_profile_status(self):
         """Activa o desactiva el perfil seleccionado"""
@@ -664,7 +711,7 @@ class ProfileManager:
 
             status_text = "activado" if new_status else "desactivado"
             self.show_info(f"✓ Perfil '{profile['name']}' {status_text}", "success")
-            self.refresh_profiles_list()
+            self._update_row(profile_id)
 
         except Exception as e:
             error_msg = self.clean_string(str(e))
@@ -673,13 +720,14 @@ class ProfileManager:
 
     def show_info(self, message, status="info"):
         """Muestra información usando el callback"""
-        if self.info_callback:
-            try:
-                self.info_callback(message, status)
-            except:
-                # Si falla, usar after para ejecutar en el hilo principal
-                if not self.is_destroyed:
-                    self.parent.after(0, lambda: self.info_callback(message, status) if self.info_callback else None)
+        if self.info_callback is None:
+            return
+
+        if threading.current_thread() is threading.main_thread():
+            self.info_callback(message, status)
+        elif not self.is_destroyed:
+            # Desde otros hilos, delegar la llamada al hilo principal
+            self.parent.after(0, self.info_callback, message, status)
 
     def clean_string(self, text):
         """Limpia un string de caracteres problemáticos"""
@@ -687,6 +735,10 @@ class ProfileManager:
             return ""
 
         try:
+            # Texto ASCII puro: no hay nada que limpiar
+            if text.isascii():
+                return text
+
             # Reemplazar caracteres problemáticos comunes
             replacements = {
                 '\xa0': ' ',  # Espacio no-rompible
@@ -728,24 +780,61 @@ class ProfileDialog:
         self.name = name
         self.search_title = search_title
         self.result = None
+        self.dialog = None
 
-    def show(self):
+    def show(self, title=None, name=None, search_title=None):
         """
-        Muestra el diálogo y retorna el resultado
+        Muestra el diálogo y retorna el resultado.
+        La ventana se construye en la primera llamada y se reutiliza después.
+
+        Args:
+            title (str): Título del diálogo (opcional)
+            name (str): Nombre inicial del perfil (opcional)
+            search_title (str): Título de búsqueda inicial (opcional)
 
         Returns:
             tuple: (name, search_title) o None si se canceló
         """
+        if title is not None:
+            self.title = title
+        self.name = name if name is not None else ""
+        self.search_title = search_title if search_title is not None else ""
+        self.result = None
+
+        if self.dialog is None or not self.dialog.winfo_exists():
+            self.build_dialog()
+        else:
+            self.dialog.title(self.title)
+            self.title_label.config(text=self.title)
+            self.name_var.set(self.name)
+            self.search_title_var.set(self.search_title)
+            self.center_dialog()
+            self.dialog.deiconify()
+
+        # Hacer modal
+        self.dialog.grab_set()
+
+        # Enfocar primer campo
+        self.name_entry.focus_set()
+
+        # Esperar hasta que se acepte o cancele
+        self.closed_var.set(False)
+        self.dialog.wait_variable(self.closed_var)
+
+        return self.result
+
+    def build_dialog(self):
+        """Construye la ventana del diálogo una sola vez"""
         # Crear ventana modal
         self.dialog = tk.Toplevel(self.parent)
         self.dialog.title(self.title)
         self.dialog.geometry("550x400")
         self.dialog.resizable(True, True)
         self.dialog.minsize(500, 350)
-
-        # Hacer modal
         self.dialog.transient(self.parent)
-        self.dialog.grab_set()
+
+        # Variable que señala el cierre del diálogo
+        self.closed_var = tk.BooleanVar(master=self.dialog, value=False)
 
         # Centrar diálogo
         self.center_dialog()
@@ -756,14 +845,6 @@ class ProfileDialog:
         # Manejar cierre
         self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
 
-        # Enfocar primer campo
-        self.name_entry.focus_set()
-
-        # Esperar hasta que se cierre
-        self.dialog.wait_window()
-
-        return self.result
-
     def center_dialog(self):
         """Centra el diálogo en la pantalla"""
         self.dialog.update_idletasks()
@@ -771,6 +852,12 @@ class ProfileDialog:
         y = (self.dialog.winfo_screenheight() // 2) - (400 // 2)
         self.dialog.geometry(f"550x400+{x}+{y}")
 
+    def close(self):
+        """Oculta el diálogo para reutilizarlo y libera la espera"""
+        self.dialog.grab_release()
+        self.dialog.withdraw()
+        self.closed_var.set(True)
+
     def create_content(self):
         """Crea el contenido del diálogo"""
         # Frame principal
@@ -778,8 +865,8 @@ class ProfileDialog:
         main_frame.pack(fill="both", expand=True)
 
         # Título
-        title_label = ttk.Label(main_frame, text=self.title, font=("Arial", 16, "bold"))
-        title_label.pack(pady=(0, 25))
+        self.title_label = ttk.Label(main_frame, text=self.title, font=("Arial", 16, "bold"))
+        self.title_label.pack(pady=(0, 25))
 
         # Variables para los campos
         self.name_var = tk.StringVar(value=self.name)
@@ -854,9 +941,9 @@ class ProfileDialog:
             return
 
         self.result = (name, search_title)
-        self.dialog.destroy()
+        self.close()
 
     def cancel(self):
         """Cancela el diálogo"""
         self.result = None
-        self.dialog.destroy()
\ No newline at end of file
+        self.close()
\ No newline at end of file
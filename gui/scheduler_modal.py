@@ -6,11 +6,51 @@ Permite configurar horarios, intervalos y días para ejecutar búsquedas automá
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+import re
 import threading
+import time
 from services.scheduler_service import SchedulerService
 
+# Formato de hora HH:MM en 24 horas (el mismo que exige la librería schedule)
+_HHMM_RE = re.compile(r'^([01]\d|2[0-3]):[0-5]\d$')
+
+# Reemplazos de caracteres problemáticos comunes en mensajes
+_CLEAN_TABLE = str.maketrans({
+    '\xa0': ' ',
+    '\u2019': "'",
+    '\u2018': "'",
+    '\u201c': '"',
+    '\u201d': '"'
+})
+
 
 class SchedulerModal:
+    __slots__ = (
+        "parent", "callback", "scheduler_service", "modal",
+        "_status_cache", "_stateful_widgets", "_widgets_enabled", "_schedule_frames", "_visible_frame",
+        "enabled_var", "enable_checkbox", "schedule_type_var",
+        "config_container", "daily_frame", "weekly_frame", "interval_frame",
+        "daily_time_var", "weekly_time_var", "day_vars", "interval_var", "unit_var",
+        "save_button", "test_button", "status_label", "progress_bar"
+    )
+
+    # Segundos durante los que se reutiliza el último estado del programador
+    STATUS_CACHE_TTL = 0.5
+
+    # Días de la semana: (clave de configuración, nombre visible)
+    WEEK_DAYS = (
+        ("monday", "Lunes"),
+        ("tuesday", "Martes"),
+        ("wednesday", "Miércoles"),
+        ("thursday", "Jueves"),
+        ("friday", "Viernes"),
+        ("saturday", "Sábado"),
+        ("sunday", "Domingo")
+    )
+
+    # Nombre visible de cada unidad de intervalo
+    UNIT_NAMES = {"minutes": "minutos", "hours": "horas"}
+
     def __init__(self, parent, callback=None):
         """
         Inicializa el modal de configuración de programación
@@ -23,6 +63,9 @@ class SchedulerModal:
         self.callback = callback
         self.scheduler_service = SchedulerService()
 
+        # Caché del último estado leído: (timestamp, status)
+        self._status_cache = None
+
         self.create_modal()
         self.load_current_configuration()
 
@@ -31,46 +74,41 @@ class SchedulerModal:
         # Crear ventana modal
         self.modal = tk.Toplevel(self.parent)
         self.modal.title("Configuración de Búsquedas Automáticas")
-        self.modal.geometry("500x600")
         self.modal.resizable(False, False)
 
         # Hacer modal
         self.modal.transient(self.parent)
         self.modal.grab_set()
 
-        # Centrar modal
-        self.center_modal()
-
         # Crear contenido
         self.create_content()
 
+        # Ajustar al contenido y centrar modal
+        self.center_modal()
+
         # Manejar cierre de ventana
         self.modal.protocol("WM_DELETE_WINDOW", self.close_modal)
 
     def center_modal(self):
-        """Centra el modal en la pantalla"""
+        """Ajusta el modal al tamaño que pide su contenido y lo centra en la pantalla"""
         self.modal.update_idletasks()
-        x = (self.modal.winfo_screenwidth() // 2) - (500 // 2)
-        y = (self.modal.winfo_screenheight() // 2) - (600 // 2)
-        self.modal.geometry(f"500x600+{x}+{y}")
 
-    def create_content(self):
-        """Crea el contenido del modal"""
-        # Frame principal con scrollbar
-        main_canvas = tk.Canvas(self.modal)
-        scrollbar = ttk.Scrollbar(self.modal, orient="vertical", command=main_canvas.yview)
-        self.scrollable_frame = ttk.Frame(main_canvas)
+        # Reservar el alto del tipo de programación más alto para que cambiar
+        # de tipo no recorte el contenido de la ventana (no redimensionable)
+        visible_height = self._visible_frame.winfo_reqheight() if self._visible_frame else 0
+        tallest_height = max(frame.winfo_reqheight() for frame in self._schedule_frames.values())
 
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: main_canvas.configure(scrollregion=main_canvas.bbox("all"))
-        )
+        width = max(500, self.modal.winfo_reqwidth())
+        height = self.modal.winfo_reqheight() + tallest_height - visible_height
 
-        main_canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        main_canvas.configure(yscrollcommand=scrollbar.set)
+        x = (self.modal.winfo_screenwidth() // 2) - (width // 2)
+        y = max(0, (self.modal.winfo_screenheight() // 2) - (height // 2))
+        self.modal.geometry(f"{width}x{height}+{x}+{y}")
 
-        # Frame de contenido principal
-        main_frame = ttk.Frame(self.scrollable_frame, padding="20")
+    def create_content(self):
+        """Crea el contenido del modal"""
+        # Frame de contenido principal (la ventana se ajusta a él en center_modal)
+        main_frame = ttk.Frame(self.modal, padding="20")
         main_frame.pack(fill="both", expand=True)
 
         # Título
@@ -82,6 +120,10 @@ class SchedulerModal:
         self.create_enable_section(main_frame)
         self.create_schedule_type_section(main_frame)
 
+        # Widgets de configuración cuyo estado depende de la casilla de habilitación
+        self._stateful_widgets = []
+        self._widgets_enabled = None
+
         # Contenedor para las configuraciones específicas
         self.config_container = ttk.Frame(main_frame)
         self.config_container.pack(fill="x", pady=(0, 15))
@@ -90,13 +132,17 @@ class SchedulerModal:
         self.create_weekly_section(self.config_container)
         self.create_interval_section(self.config_container)
 
+        # Frames de configuración por tipo y el que está visible actualmente
+        self._schedule_frames = {
+            "daily": self.daily_frame,
+            "weekly": self.weekly_frame,
+            "interval": self.interval_frame
+        }
+        self._visible_frame = None
+
         self.create_buttons(main_frame)
         self.create_status_area(main_frame)
 
-        # Pack canvas y scrollbar
-        main_canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
         # Configurar eventos
         self.setup_events()
 
@@ -109,7 +155,7 @@ class SchedulerModal:
         # Variable y checkbox para habilitar
         self.enabled_var = tk.BooleanVar()
         self.enable_checkbox = ttk.Checkbutton(enable_frame, text="Habilitar búsquedas automáticas",
-                                               variable=self.enabled_var)
+                                               variable=self.enabled_var, command=self.on_enabled_change)
         self.enable_checkbox.pack(anchor="w")
 
     def create_schedule_type_section(self, parent):
@@ -123,13 +169,16 @@ class SchedulerModal:
 
         # Opciones de tipo
         ttk.Radiobutton(type_frame, text="Diario - Ejecutar todos los días a una hora específica",
-                        variable=self.schedule_type_var, value="daily").pack(anchor="w", pady=2)
+                        variable=self.schedule_type_var, value="daily",
+                        command=self.on_schedule_type_change).pack(anchor="w", pady=2)
 
         ttk.Radiobutton(type_frame, text="Semanal - Ejecutar días específicos de la semana",
-                        variable=self.schedule_type_var, value="weekly").pack(anchor="w", pady=2)
+                        variable=self.schedule_type_var, value="weekly",
+                        command=self.on_schedule_type_change).pack(anchor="w", pady=2)
 
         ttk.Radiobutton(type_frame, text="Por Intervalo - Ejecutar cada cierto tiempo",
-                        variable=self.schedule_type_var, value="interval").pack(anchor="w", pady=2)
+                        variable=self.schedule_type_var, value="interval",
+                        command=self.on_schedule_type_change).pack(anchor="w", pady=2)
 
     def create_daily_section(self, parent):
         """Crea la sección de configuración diaria"""
@@ -148,6 +197,8 @@ class SchedulerModal:
                                   foreground="gray", font=("Arial", 9))
         example_label.grid(row=1, column=0, columnspan=2, sticky="w")
 
+        self.register_stateful_widgets(time_label, time_entry, example_label)
+
     def create_weekly_section(self, parent):
         """Crea la sección de configuración semanal"""
         self.weekly_frame = ttk.LabelFrame(parent, text="Configuración Semanal", padding="10")
@@ -164,29 +215,23 @@ class SchedulerModal:
         days_label = ttk.Label(self.weekly_frame, text="Días de la semana:")
         days_label.grid(row=1, column=0, columnspan=2, sticky="w", pady=(15, 5))
 
+        self.register_stateful_widgets(time_label, time_entry, days_label)
+
         # Frame para checkboxes de días
         days_frame = ttk.Frame(self.weekly_frame)
         days_frame.grid(row=2, column=0, columnspan=2, sticky="ew", pady=5)
 
         # Variables para días
         self.day_vars = {}
-        days = [
-            ("monday", "Lunes"),
-            ("tuesday", "Martes"),
-            ("wednesday", "Miércoles"),
-            ("thursday", "Jueves"),
-            ("friday", "Viernes"),
-            ("saturday", "Sábado"),
-            ("sunday", "Domingo")
-        ]
-
-        for i, (day_key, day_name) in enumerate(days):
+
+        for i, (day_key, day_name) in enumerate(self.WEEK_DAYS):
             self.day_vars[day_key] = tk.BooleanVar()
             if day_key in ["monday", "wednesday", "friday"]:  # Días por defecto
                 self.day_vars[day_key].set(True)
 
             checkbox = ttk.Checkbutton(days_frame, text=day_name, variable=self.day_vars[day_key])
             checkbox.grid(row=i // 4, column=i % 4, sticky="w", padx=(0, 15), pady=2)
+            self.register_stateful_widgets(checkbox)
 
     def create_interval_section(self, parent):
         """Crea la sección de configuración por intervalo"""
@@ -211,6 +256,17 @@ class SchedulerModal:
                                   foreground="gray", font=("Arial", 9))
         example_label.grid(row=1, column=0, columnspan=3, sticky="w", pady=(10, 0))
 
+        self.register_stateful_widgets(interval_label, interval_spinbox, unit_combo, example_label)
+
+    def register_stateful_widgets(self, *widgets):
+        """
+        Registra widgets cuyo estado se sincroniza con la casilla de habilitación
+
+        Args:
+            *widgets: Widgets ttk (se alterna su bandera de estado 'disabled')
+        """
+        self._stateful_widgets.extend(widgets)
+
     def create_buttons(self, parent):
         """Crea los botones del modal"""
         # Frame para botones
@@ -243,21 +299,25 @@ class SchedulerModal:
                                       foreground="blue")
         self.status_label.pack(pady=5)
 
+        # Hueco fijo para la barra de progreso: mostrarla u ocultarla no
+        # obliga a recalcular la geometría del resto del modal
+        progress_slot = ttk.Frame(status_frame, height=40)
+        progress_slot.pack(fill="x")
+        progress_slot.grid_propagate(False)
+        progress_slot.grid_columnconfigure(0, weight=1)
+
         # Progressbar (oculto inicialmente)
-        self.progress_bar = ttk.Progressbar(status_frame, mode="indeterminate")
+        self.progress_bar = ttk.Progressbar(progress_slot, mode="indeterminate")
+        self.progress_bar.grid(row=0, column=0, pady=10)
+        self.progress_bar.grid_remove()
 
         # Actualizar estado inicial
         self.update_scheduler_status()
 
     def setup_events(self):
         """Configura los eventos de la interfaz"""
-        # Cambio en tipo de programación
-        self.schedule_type_var.trace('w', self.on_schedule_type_change)
-
-        # Cambio en estado habilitado
-        self.enabled_var.trace('w', self.on_enabled_change)
-
-        # Aplicar configuración inicial
+        # Los cambios del usuario llegan por el 'command' de cada widget;
+        # aquí solo se aplica el estado inicial
         self.on_schedule_type_change()
         self.on_enabled_change()
 
@@ -265,19 +325,20 @@ class SchedulerModal:
         """Maneja el cambio de tipo de programación"""
         try:
             schedule_type = self.schedule_type_var.get()
+            frame = self._schedule_frames.get(schedule_type)
+
+            # Sin cambios en el frame visible: evitar recalcular la geometría
+            if frame is self._visible_frame:
+                return
 
-            # Ocultar todos los frames primero
-            self.daily_frame.pack_forget()
-            self.weekly_frame.pack_forget()
-            self.interval_frame.pack_forget()
+            # Ocultar solo el frame visible anterior
+            if self._visible_frame is not None:
+                self._visible_frame.pack_forget()
 
             # Mostrar el frame correspondiente
-            if schedule_type == "daily":
-                self.daily_frame.pack(fill="x", pady=(0, 10))
-            elif schedule_type == "weekly":
-                self.weekly_frame.pack(fill="x", pady=(0, 10))
-            elif schedule_type == "interval":
-                self.interval_frame.pack(fill="x", pady=(0, 10))
+            if frame is not None:
+                frame.pack(fill="x", pady=(0, 10))
+            self._visible_frame = frame
 
         except Exception as e:
             print(f"Error cambiando tipo de programación: {e}")
@@ -287,27 +348,58 @@ class SchedulerModal:
         try:
             enabled = self.enabled_var.get()
 
-            # Habilitar/deshabilitar controles de configuración
-            state = "normal" if enabled else "disabled"
+            # Sin cambios respecto al último estado aplicado
+            if enabled == self._widgets_enabled:
+                return
+            self._widgets_enabled = enabled
 
-            # Obtener todos los widgets dentro de cada frame de configuración
-            for frame in [self.daily_frame, self.weekly_frame, self.interval_frame]:
-                for widget in frame.winfo_children():
-                    try:
-                        if hasattr(widget, 'configure'):
-                            widget_config = widget.configure()
-                            if 'state' in widget_config:
-                                widget.configure(state=state)
-                    except Exception:
-                        continue  # Ignorar widgets que no soportan 'state'
+            # Alternar solo la bandera 'disabled' de ttk; el resto de banderas
+            # (p. ej. 'readonly' del combo de unidad) se conservan
+            state_spec = ["!disabled"] if enabled else ["disabled"]
+            for widget in self._stateful_widgets:
+                widget.state(state_spec)
 
         except Exception as e:
             print(f"Error cambiando estado habilitado: {e}")
 
     def load_current_configuration(self):
-        """Carga la configuración actual si existe"""
+        """Carga la configuración actual en un hilo separado para no bloquear la apertura"""
+        self.update_status("Cargando configuración...", "blue")
+
+        # Mientras carga, guardar escribiría los valores por defecto del formulario
+        # sobre la configuración existente
+        self.save_button.state(["disabled"])
+        self.test_button.state(["disabled"])
+
+        thread = threading.Thread(target=self._load_configuration_thread, daemon=True)
+        thread.start()
+
+    def _load_configuration_thread(self):
+        """Lee la configuración desde disco en un hilo separado"""
         try:
             config = self.scheduler_service.load_configuration()
+            self.modal.after(0, self._apply_loaded_configuration, config, None)
+        except Exception as e:
+            try:
+                self.modal.after(0, self._apply_loaded_configuration, None, str(e))
+            except Exception:
+                pass  # El modal ya se cerró
+
+    def _apply_loaded_configuration(self, config, error=None):
+        """Aplica la configuración cargada a los campos del formulario (hilo principal)"""
+        try:
+            if not self.modal.winfo_exists():
+                return
+
+            # La carga terminó (con o sin configuración, o con error): habilitar acciones
+            self.save_button.state(["!disabled"])
+            self.test_button.state(["!disabled"])
+
+            if error:
+                error_msg = self.clean_error_message(error)
+                self.update_status(f"Error cargando configuración: {error_msg}", "red")
+                return
+
             if config:
                 # Cargar estado habilitado
                 self.enabled_var.set(config.get("enabled", False))
@@ -329,9 +421,12 @@ class SchedulerModal:
                     self.interval_var.set(str(config.get("interval", 60)))
                     self.unit_var.set(config.get("unit", "minutes"))
 
-                self.update_status("Configuración cargada", "green")
-            else:
-                self.update_status("Sin configuración previa", "blue")
+                # Los cambios programáticos no disparan 'command': aplicar manualmente
+                self.on_schedule_type_change()
+                self.on_enabled_change()
+
+            # Reemplazar el aviso de carga por el estado real del programador
+            self.update_scheduler_status()
 
         except Exception as e:
             error_msg = self.clean_error_message(str(e))
@@ -339,18 +434,19 @@ class SchedulerModal:
 
     def save_configuration(self):
         """Guarda la configuración del programador"""
-        if not self.validate_configuration():
+        form_state = self._snapshot_form_state()
+        if not self.validate_configuration(form_state):
             return
 
         try:
             # Deshabilitar botón y mostrar progreso
             self.save_button.config(state="disabled")
-            self.progress_bar.pack(pady=10)
+            self.progress_bar.grid()
             self.progress_bar.start()
             self.update_status("Guardando configuración...", "blue")
 
             # Ejecutar guardado en hilo separado
-            thread = threading.Thread(target=self._save_configuration_thread, daemon=True)
+            thread = threading.Thread(target=self._save_configuration_thread, args=(form_state,), daemon=True)
             thread.start()
 
         except Exception as e:
@@ -358,30 +454,18 @@ class SchedulerModal:
             self.update_status(f"Error iniciando guardado: {error_msg}", "red")
             self.save_button.config(state="normal")
             self.progress_bar.stop()
-            self.progress_bar.pack_forget()
+            self.progress_bar.grid_remove()
+
+    def _save_configuration_thread(self, form_state):
+        """
+        Guarda la configuración en un hilo separado
 
-    def _save_configuration_thread(self):
-        """Guarda la configuración en un hilo separado"""
+        Args:
+            form_state (dict): Valores del formulario leídos en el hilo principal
+        """
         try:
             # Construir configuración
-            config = {
-                "enabled": self.enabled_var.get(),
-                "type": self.schedule_type_var.get()
-            }
-
-            # Agregar configuración específica según el tipo
-            schedule_type = self.schedule_type_var.get()
-
-            if schedule_type == "daily":
-                config["time"] = self.daily_time_var.get().strip()
-
-            elif schedule_type == "weekly":
-                config["time"] = self.weekly_time_var.get().strip()
-                config["days"] = [day for day, var in self.day_vars.items() if var.get()]
-
-            elif schedule_type == "interval":
-                config["interval"] = int(self.interval_var.get())
-                config["unit"] = self.unit_var.get()
+            config = self._build_config_from_form(form_state)
 
             # Guardar configuración
             self.scheduler_service.save_configuration(config)
@@ -410,14 +494,15 @@ class SchedulerModal:
         try:
             # Detener progreso y rehabilitar botón
             self.progress_bar.stop()
-            self.progress_bar.pack_forget()
+            self.progress_bar.grid_remove()
             self.save_button.config(state="normal")
 
             # Actualizar estado
             color = "green" if success else "red"
             self.update_status(message, color)
 
-            # Actualizar estado del programador
+            # Actualizar estado del programador con datos frescos
+            self.invalidate_status_cache()
             self.update_scheduler_status()
 
             # Mostrar resultado
@@ -435,26 +520,13 @@ class SchedulerModal:
 
     def test_configuration(self):
         """Prueba la configuración actual"""
-        if not self.validate_configuration():
+        form_state = self._snapshot_form_state()
+        if not self.validate_configuration(form_state):
             return
 
         try:
             # Construir configuración temporal para probar
-            config = {
-                "enabled": self.enabled_var.get(),
-                "type": self.schedule_type_var.get()
-            }
-
-            schedule_type = self.schedule_type_var.get()
-
-            if schedule_type == "daily":
-                config["time"] = self.daily_time_var.get().strip()
-            elif schedule_type == "weekly":
-                config["time"] = self.weekly_time_var.get().strip()
-                config["days"] = [day for day, var in self.day_vars.items() if var.get()]
-            elif schedule_type == "interval":
-                config["interval"] = int(self.interval_var.get())
-                config["unit"] = self.unit_var.get()
+            config = self._build_config_from_form(form_state)
 
             # Validar configuración
             if self.scheduler_service._validate_config(config):
@@ -473,69 +545,161 @@ class SchedulerModal:
             error_msg = self.clean_error_message(str(e))
             messagebox.showerror("Error", f"Error probando configuración: {error_msg}", parent=self.modal)
 
-    def validate_configuration(self):
-        """Valida la configuración antes de guardar"""
+    def _build_config_from_form(self, form_state):
+        """
+        Construye el diccionario de configuración a partir del estado del formulario
+
+        Args:
+            form_state (dict): Valores del formulario obtenidos con _snapshot_form_state
+
+        Returns:
+            dict: Configuración lista para validar o guardar
+        """
+        config = {
+            "enabled": form_state["enabled"],
+            "type": form_state["type"]
+        }
+
+        # Agregar configuración específica según el tipo
+        schedule_type = form_state["type"]
+
+        if schedule_type == "daily":
+            config["time"] = form_state["daily_time"]
+
+        elif schedule_type == "weekly":
+            config["time"] = form_state["weekly_time"]
+            config["days"] = form_state["days"]
+
+        elif schedule_type == "interval":
+            config["interval"] = int(form_state["interval"])
+            config["unit"] = form_state["unit"]
+
+        return config
+
+    def validate_configuration(self, form_state):
+        """
+        Valida la configuración antes de guardar.
+        Todos los errores encontrados se muestran juntos en un único mensaje.
+
+        Args:
+            form_state (dict): Valores del formulario obtenidos con _snapshot_form_state
+        """
+        errors = []
+
         try:
-            if not self.enabled_var.get():
+            if not form_state["enabled"]:
                 return True  # Si está deshabilitado, no necesita validación adicional
 
-            schedule_type = self.schedule_type_var.get()
+            schedule_type = form_state["type"]
 
             if schedule_type in ["daily", "weekly"]:
-                time_var = self.daily_time_var if schedule_type == "daily" else self.weekly_time_var
-                time_str = time_var.get().strip()
+                time_str = form_state["daily_time"] if schedule_type == "daily" else form_state["weekly_time"]
 
                 if not time_str:
-                    messagebox.showerror("Error", "El campo de hora es requerido", parent=self.modal)
-                    return False
-
-                # Validar formato de hora
-                try:
-                    from datetime import datetime
-                    datetime.strptime(time_str, "%H:%M")
-                except ValueError:
-                    messagebox.showerror("Error", "Formato de hora inválido. Use HH:MM (ej: 14:30)", parent=self.modal)
-                    return False
+                    errors.append("El campo de hora es requerido")
+                elif not _HHMM_RE.match(time_str):
+                    # Validar formato de hora
+                    errors.append("Formato de hora inválido. Use HH:MM (ej: 14:30)")
 
                 # Para configuración semanal, validar que al menos un día esté seleccionado
-                if schedule_type == "weekly":
-                    selected_days = [day for day, var in self.day_vars.items() if var.get()]
-                    if not selected_days:
-                        messagebox.showerror("Error", "Debe seleccionar al menos un día de la semana",
-                                             parent=self.modal)
-                        return False
+                if schedule_type == "weekly" and not form_state["days"]:
+                    errors.append("Debe seleccionar al menos un día de la semana")
 
             elif schedule_type == "interval":
                 try:
-                    interval = int(self.interval_var.get())
+                    interval = int(form_state["interval"])
                     if interval <= 0:
-                        messagebox.showerror("Error", "El intervalo debe ser mayor que 0", parent=self.modal)
-                        return False
-
-                    # Validar límites razonables
-                    unit = self.unit_var.get()
-                    if unit == "minutes" and interval < 1:
-                        messagebox.showerror("Error", "El intervalo mínimo es 1 minuto", parent=self.modal)
-                        return False
-                    elif unit == "hours" and interval < 1:
-                        messagebox.showerror("Error", "El intervalo mínimo es 1 hora", parent=self.modal)
-                        return False
+                        errors.append("El intervalo debe ser mayor que 0")
+                    else:
+                        # Validar límites razonables
+                        unit = form_state["unit"]
+                        if unit == "minutes" and interval < 1:
+                            errors.append("El intervalo mínimo es 1 minuto")
+                        elif unit == "hours" and interval < 1:
+                            errors.append("El intervalo mínimo es 1 hora")
 
                 except ValueError:
-                    messagebox.showerror("Error", "El intervalo debe ser un número válido", parent=self.modal)
-                    return False
-
-            return True
+                    errors.append("El intervalo debe ser un número válido")
 
         except Exception as e:
             error_msg = self.clean_error_message(str(e))
-            messagebox.showerror("Error", f"Error validando configuración: {error_msg}", parent=self.modal)
+            errors.append(f"Error validando configuración: {error_msg}")
+
+        if errors:
+            self.show_error("\n".join(errors))
             return False
 
+        return True
+
+    def show_error(self, message, title="Error"):
+        """
+        Muestra un mensaje de error sobre el modal en el próximo ciclo inactivo
+
+        Args:
+            message (str): Mensaje a mostrar
+            title (str): Título de la ventana de error
+        """
+        self.modal.after_idle(self._show_error_now, title, message)
+
+    def _show_error_now(self, title, message):
+        """Muestra el mensaje de error si el modal sigue abierto"""
+        try:
+            if self.modal.winfo_exists():
+                messagebox.showerror(title, message, parent=self.modal)
+        except tk.TclError:
+            pass  # El modal ya se cerró
+
+    def get_scheduler_status(self):
+        """
+        Obtiene el estado del programador reutilizando la última lectura si es reciente
+
+        Returns:
+            dict: Estado del programador
+        """
+        now = time.monotonic()
+        if self._status_cache is not None:
+            timestamp, status = self._status_cache
+            if now - timestamp < self.STATUS_CACHE_TTL:
+                return status
+
+        status = self.scheduler_service.get_scheduler_status()
+        self._status_cache = (now, status)
+        return status
+
+    def invalidate_status_cache(self):
+        """Descarta el estado en caché para forzar una nueva lectura"""
+        self._status_cache = None
+
+    def _collect_selected_days(self):
+        """
+        Obtiene los días de la semana marcados en el formulario
+
+        Returns:
+            list: Claves de los días seleccionados
+        """
+        return [day for day, var in self.day_vars.items() if var.get()]
+
+    def _snapshot_form_state(self):
+        """
+        Lee todas las variables del formulario de una sola vez en el hilo principal
+
+        Returns:
+            dict: Valores actuales del formulario
+        """
+        return {
+            "enabled": self.enabled_var.get(),
+            "type": self.schedule_type_var.get(),
+            "daily_time": self.daily_time_var.get().strip(),
+            "weekly_time": self.weekly_time_var.get().strip(),
+            "interval": self.interval_var.get(),
+            "unit": self.unit_var.get(),
+            "days": self._collect_selected_days()
+        }
+
     def update_scheduler_status(self):
         """Actualiza el estado del programador"""
         try:
-            status = self.scheduler_service.get_scheduler_status()
+            status = self.get_scheduler_status()
 
             if status["is_running"] and status["enabled"]:
                 status_text = f"🟢 Programador ACTIVO - {status.get('schedule_details', 'Sin detalles')}"
@@ -568,14 +732,11 @@ class SchedulerModal:
         if schedule_type == "daily":
             return f"Ejecutar diariamente a las {config.get('time', '09:00')}"
         elif schedule_type == "weekly":
-            days = config.get("days", [])
-            days_str = ", ".join([day.capitalize() for day in days])
+            days_str = ", ".join(map(str.capitalize, config.get("days", ())))
             return f"Ejecutar {days_str} a las {config.get('time', '09:00')}"
         elif schedule_type == "interval":
-            interval = config.get("interval", 60)
-            unit = config.get("unit", "minutes")
-            unit_name = "minutos" if unit == "minutes" else "horas"
-            return f"Ejecutar cada {interval} {unit_name}"
+            unit_name = self.UNIT_NAMES.get(config.get("unit", "minutes"), "horas")
+            return f"Ejecutar cada {config.get('interval', 60)} {unit_name}"
 
         return "Configuración desconocida"
 
@@ -593,13 +754,8 @@ class SchedulerModal:
             if not message:
                 return ""
 
-            # Reemplazar caracteres problemáticos comunes
-            message = str(message)
-            message = message.replace('\xa0', ' ')
-            message = message.replace('\u2019', "'")
-            message = message.replace('\u2018', "'")
-            message = message.replace('\u201c', '"')
-            message = message.replace('\u201d', '"')
+            # Reemplazar caracteres problemáticos comunes en una sola pasada
+            message = str(message).translate(_CLEAN_TABLE)
 
             # Codificar y decodificar para limpiar caracteres problemáticos
             return message.encode('ascii', 'ignore').decode('ascii')
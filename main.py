@@ -4,10 +4,27 @@ Punto de entrada principal del Bot de Python con interfaz tkinter.
 Inicializa y ejecuta la ventana principal con gestión de perfiles y programación automática.
 """
 
-import tkinter as tk
+import importlib.util
 import sys
 from pathlib import Path
 
+# Dependencias requeridas: (módulo a localizar, nombre del paquete)
+# Para tkinter se localiza el módulo nativo _tkinter sin cargar Tcl/Tk
+REQUIRED_DEPENDENCIES = (
+    ("_tkinter", "tkinter"),  # Debería estar incluido con Python
+    ("schedule", "schedule")  # Requerido para programación automática
+)
+
+# Tema visual opcional
+THEME_FILE = Path("azure.tcl")
+
+# Directorios de trabajo de la aplicación
+APP_DIRECTORIES = (
+    Path("config"),  # Para configuraciones y perfiles
+    Path("reports"),  # Para reportes generados
+    Path("logs")  # Para logs (futuro uso)
+)
+
 
 def check_dependencies():
     """
@@ -16,25 +33,12 @@ def check_dependencies():
     Returns:
         bool: True si todas las dependencias están disponibles
     """
-    missing_deps = []
-
-    # Verificar tkinter (debería estar incluido con Python)
-    try:
-        import tkinter as tk
-        from tkinter import ttk
-    except ImportError:
-        missing_deps.append("tkinter")
-
-    # Verificar schedule (requerido para programación automática)
-    try:
-        import schedule
-    except ImportError:
-        missing_deps.append("schedule")
+    # Localizar las dependencias requeridas sin ejecutar los módulos
+    missing_deps = [package for module, package in REQUIRED_DEPENDENCIES
+                    if importlib.util.find_spec(module) is None]
 
     # Verificar dependencias opcionales pero recomendadas
-    try:
-        import openpyxl
-    except ImportError:
+    if importlib.util.find_spec("openpyxl") is None:
         print("ADVERTENCIA: openpyxl no está instalado. Los reportes Excel no estarán disponibles.")
         print("Para instalar: pip install openpyxl")
 
@@ -53,14 +57,8 @@ def check_dependencies():
 
 def setup_directories():
     """Crea los directorios necesarios si no existen"""
-    directories = [
-        "config",  # Para configuraciones y perfiles
-        "reports",  # Para reportes generados
-        "logs"  # Para logs (futuro uso)
-    ]
-
-    for directory in directories:
-        Path(directory).mkdir(exist_ok=True)
+    for directory in APP_DIRECTORIES:
+        directory.mkdir(exist_ok=True)
 
 
 def main():
@@ -74,25 +72,30 @@ def main():
         # Configurar directorios
         setup_directories()
 
+        # Importar la interfaz solo después de verificar las dependencias
+        import tkinter as tk
+        from tkinter import messagebox
+        from gui.main_window import MainWindow
+
         # Crear ventana principal
         root = tk.Tk()
 
-        # Configurar tema (si está disponible)
-        try:
-            root.tk.call("source", "azure.tcl")
-            root.tk.call("set_theme", "light")
-        except tk.TclError:
-            # Si no hay tema personalizado, usar el tema por defecto
-            pass
+        # Configurar tema (si está disponible); sin el archivo no se invoca a Tcl
+        if THEME_FILE.is_file():
+            try:
+                root.tk.call("source", str(THEME_FILE))
+                root.tk.call("set_theme", "light")
+            except tk.TclError:
+                # Si el tema no se puede cargar, usar el tema por defecto
+                pass
 
-        # Importar y crear la aplicación principal
-        from gui.main_window import MainWindow
+        # Crear la aplicación principal
         app = MainWindow(root)
 
         # Configurar manejo de cierre de ventana
         def on_closing():
             """Maneja el cierre de la aplicación"""
-            if tk.messagebox.askyesno("Salir", "¿Está seguro de que desea cerrar la aplicación?"):
+            if messagebox.askyesno("Salir", "¿Está seguro de que desea cerrar la aplicación?"):
                 root.quit()
                 root.destroy()
 
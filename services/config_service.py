@@ -5,11 +5,22 @@ Guarda y carga credenciales de manera segura con cifrado básico y configuració
 """
 
 import json
-import base64
+import os
+import shutil
+from datetime import datetime
 from pathlib import Path
 
 
 class ConfigService:
+    # Reemplazos de caracteres problemáticos comunes (una sola pasada con str.translate)
+    _TRANSLATE = str.maketrans({
+        '\xa0': ' ',  # Espacio no-rompible
+        '\u2019': "'",  # Apostrofe curvo
+        '\u2018': "'",  # Apostrofe curvo
+        '\u201c': '"',  # Comilla curva
+        '\u201d': '"'  # Comilla curva
+    })
+
     def __init__(self, config_dir="config"):
         """
         Inicializa el servicio de configuración
@@ -20,6 +31,16 @@ class ConfigService:
         self.config_dir = Path(config_dir)
         self.credentials_file = self.config_dir / "credentials.json"
         self.email_send_file = self.config_dir / "email_send_config.json"
+
+        # Rutas como texto para los diccionarios de información
+        self._config_dir_str = str(self.config_dir)
+        self._credentials_file_str = str(self.credentials_file)
+        self._email_send_file_str = str(self.email_send_file)
+
+        # Cachés de archivos ya leídos: ((st_mtime_ns, st_size), datos)
+        self._credentials_cache = None
+        self._email_send_cache = None
+
         self.ensure_config_directory()
 
     def ensure_config_directory(self):
@@ -37,21 +58,19 @@ class ConfigService:
             Exception: Si hay error guardando el archivo
         """
         try:
-            # Cifrar la contraseña antes de guardar
-            encrypted_credentials = credentials.copy()
-            if "password" in encrypted_credentials:
-                encrypted_credentials["password"] = self._encrypt_password(
-                    encrypted_credentials["password"]
-                )
-
-            # Limpiar strings de caracteres problemáticos
-            for key, value in encrypted_credentials.items():
-                if isinstance(value, str):
-                    encrypted_credentials[key] = self._clean_string(value)
+            # Cifrar la contraseña y limpiar strings de caracteres problemáticos
+            # en una sola pasada
+            clean = self._clean_string
+            encrypted_credentials = {
+                key: self._encrypt_password(value) if key == "password"
+                else clean(value) if isinstance(value, str)
+                else value
+                for key, value in credentials.items()
+            }
 
             # Guardar en archivo JSON con codificación segura
-            with open(self.credentials_file, "w", encoding="utf-8") as f:
-                json.dump(encrypted_credentials, f, indent=4, ensure_ascii=True)
+            self._credentials_cache = None
+            self._write_json(self.credentials_file, encrypted_credentials)
 
         except Exception as e:
             error_msg = str(e).encode('ascii', 'ignore').decode('ascii')
@@ -68,24 +87,29 @@ class ConfigService:
             Exception: Si hay error cargando el archivo
         """
         try:
-            if not self.credentials_file.exists():
+            try:
+                cache_key = self._file_cache_key(self.credentials_file)
+            except FileNotFoundError:
                 return None
 
-            with open(self.credentials_file, "r", encoding="utf-8") as f:
-                credentials = json.load(f)
+            # Reutilizar la última lectura si el archivo no ha cambiado
+            if self._credentials_cache and self._credentials_cache[0] == cache_key:
+                return dict(self._credentials_cache[1])
 
-            # Descifrar la contraseña
-            if "password" in credentials:
-                credentials["password"] = self._decrypt_password(
-                    credentials["password"]
-                )
+            raw_credentials = json.loads(self.credentials_file.read_bytes())
 
-            # Limpiar strings de caracteres problemáticos
-            for key, value in credentials.items():
-                if isinstance(value, str):
-                    credentials[key] = self._clean_string(value)
+            # Descifrar la contraseña y limpiar strings de caracteres problemáticos
+            # en una sola pasada
+            clean = self._clean_string
+            credentials = {
+                key: (clean(self._decrypt_password(value)) if key == "password"
+                      else clean(value)) if isinstance(value, str)
+                else value
+                for key, value in raw_credentials.items()
+            }
 
-            return credentials
+            self._credentials_cache = (cache_key, credentials)
+            return dict(credentials)
 
         except Exception as e:
             error_msg = str(e).encode('ascii', 'ignore').decode('ascii')
@@ -108,6 +132,7 @@ class ConfigService:
             bool: True si se eliminaron exitosamente
         """
         try:
+            self._credentials_cache = None
             if self.credentials_file.exists():
                 self.credentials_file.unlink()
                 return True
@@ -127,16 +152,11 @@ class ConfigService:
         """
         try:
             # Limpiar strings de caracteres problemáticos
-            clean_config = {}
-            for key, value in config.items():
-                if isinstance(value, str):
-                    clean_config[key] = self._clean_string(value)
-                else:
-                    clean_config[key] = value
+            clean_config = self._clean_dict(config)
 
             # Guardar en archivo JSON
-            with open(self.email_send_file, "w", encoding="utf-8") as f:
-                json.dump(clean_config, f, indent=4, ensure_ascii=True)
+            self._email_send_cache = None
+            self._write_json(self.email_send_file, clean_config)
 
         except Exception as e:
             error_msg = str(e).encode('ascii', 'ignore').decode('ascii')
@@ -153,21 +173,22 @@ class ConfigService:
             Exception: Si hay error cargando la configuración
         """
         try:
-            if not self.email_send_file.exists():
+            try:
+                cache_key = self._file_cache_key(self.email_send_file)
+            except FileNotFoundError:
                 return None
 
-            with open(self.email_send_file, "r", encoding="utf-8") as f:
-                config = json.load(f)
+            # Reutilizar la última lectura si el archivo no ha cambiado
+            if self._email_send_cache and self._email_send_cache[0] == cache_key:
+                return dict(self._email_send_cache[1])
+
+            config = json.loads(self.email_send_file.read_bytes())
 
             # Limpiar strings de caracteres problemáticos
-            clean_config = {}
-            for key, value in config.items():
-                if isinstance(value, str):
-                    clean_config[key] = self._clean_string(value)
-                else:
-                    clean_config[key] = value
+            clean_config = self._clean_dict(config)
 
-            return clean_config
+            self._email_send_cache = (cache_key, clean_config)
+            return dict(clean_config)
 
         except Exception as e:
             error_msg = str(e).encode('ascii', 'ignore').decode('ascii')
@@ -190,6 +211,7 @@ class ConfigService:
             bool: True si se eliminó exitosamente
         """
         try:
+            self._email_send_cache = None
             if self.email_send_file.exists():
                 self.email_send_file.unlink()
                 return True
@@ -254,16 +276,13 @@ class ConfigService:
                 raise Exception("No hay credenciales para respaldar")
 
             if not backup_name:
-                from datetime import datetime
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 backup_name = f"credentials_backup_{timestamp}.json"
 
             backup_path = self.config_dir / backup_name
 
             # Copiar archivo
-            with open(self.credentials_file, "r", encoding="utf-8") as src:
-                with open(backup_path, "w", encoding="utf-8") as dst:
-                    dst.write(src.read())
+            shutil.copyfile(self.credentials_file, backup_path)
 
             return str(backup_path)
 
@@ -282,17 +301,17 @@ class ConfigService:
         """
         try:
             backup_file = Path(backup_path)
-            if not backup_file.exists():
+            try:
+                data = backup_file.read_bytes()
+            except FileNotFoundError:
                 raise Exception(f"El archivo de respaldo no existe: {backup_path}")
 
             # Validar que el respaldo es válido
-            with open(backup_file, "r", encoding="utf-8") as f:
-                json.load(f)  # Esto lanzará excepción si no es JSON válido
+            json.loads(data)  # Esto lanzará excepción si no es JSON válido
 
-            # Copiar archivo
-            with open(backup_file, "r", encoding="utf-8") as src:
-                with open(self.credentials_file, "w", encoding="utf-8") as dst:
-                    dst.write(src.read())
+            # Escribir los mismos bytes ya leídos (se conserva el respaldo original)
+            self._credentials_cache = None
+            self._write_bytes(self.credentials_file, data)
 
         except Exception as e:
             raise Exception(f"Error restaurando respaldo: {str(e)}")
@@ -305,32 +324,75 @@ class ConfigService:
             dict: Información de configuración
         """
         info = {
-            "config_directory": str(self.config_dir),
-            "credentials_file": str(self.credentials_file),
-            "email_send_file": str(self.email_send_file),
-            "credentials_exist": self.credentials_exist(),
-            "email_send_config_exists": self.email_send_config_exists(),
+            "config_directory": self._config_dir_str,
+            "credentials_file": self._credentials_file_str,
+            "email_send_file": self._email_send_file_str,
+            "credentials_exist": False,
+            "email_send_config_exists": False,
             "credentials_file_size": 0,
             "email_send_file_size": 0,
             "credentials_last_modified": None,
             "email_send_last_modified": None
         }
 
+        # Una sola llamada a stat() por archivo: existencia, tamaño y fecha
         try:
-            if self.credentials_file.exists():
-                stat = self.credentials_file.stat()
-                info["credentials_file_size"] = stat.st_size
-                info["credentials_last_modified"] = stat.st_mtime
+            stat = self.credentials_file.stat()
+            info["credentials_exist"] = True
+            info["credentials_file_size"] = stat.st_size
+            info["credentials_last_modified"] = stat.st_mtime
+        except OSError:
+            pass
 
-            if self.email_send_file.exists():
-                stat = self.email_send_file.stat()
-                info["email_send_file_size"] = stat.st_size
-                info["email_send_last_modified"] = stat.st_mtime
-        except Exception:
+        try:
+            stat = self.email_send_file.stat()
+            info["email_send_config_exists"] = True
+            info["email_send_file_size"] = stat.st_size
+            info["email_send_last_modified"] = stat.st_mtime
+        except OSError:
             pass
 
         return info
 
+    def _write_json(self, path, data):
+        """
+        Escribe datos como JSON compacto de forma atómica
+
+        Args:
+            path (Path): Archivo de destino
+            data (dict): Datos a guardar
+        """
+        content = json.dumps(data, ensure_ascii=True, separators=(',', ':')).encode('ascii')
+        self._write_bytes(path, content)
+
+    def _write_bytes(self, path, content):
+        """
+        Escribe bytes en un archivo de forma atómica (archivo temporal + os.replace)
+
+        Args:
+            path (Path): Archivo de destino
+            content (bytes): Contenido a escribir
+        """
+        temp_path = path.with_suffix(path.suffix + ".tmp")
+        temp_path.write_bytes(content)
+        os.replace(temp_path, path)
+
+    def _file_cache_key(self, path):
+        """
+        Obtiene la clave de caché de un archivo a partir de su estado en disco
+
+        Args:
+            path (Path): Archivo a consultar
+
+        Returns:
+            tuple: (st_mtime_ns, st_size)
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe
+        """
+        stat = path.stat()
+        return (stat.st_mtime_ns, stat.st_size)
+
     def _encrypt_password(self, password):
         """
         Cifra una contraseña usando base64 (cifrado básico)
@@ -342,11 +404,11 @@ class ConfigService:
         Returns:
             str: Contraseña cifrada
         """
+        import base64
+
         try:
-            # Codificar a bytes y luego a base64
-            encoded_bytes = password.encode('utf-8')
-            encrypted_bytes = base64.b64encode(encoded_bytes)
-            return encrypted_bytes.decode('utf-8')
+            # Codificar a bytes y luego a base64 (la salida siempre es ASCII)
+            return base64.b64encode(password.encode('utf-8')).decode('ascii')
         except Exception:
             return password  # Si hay error, devolver sin cifrar
 
@@ -360,11 +422,11 @@ class ConfigService:
         Returns:
             str: Contraseña descifrada
         """
+        import base64
+
         try:
-            # Decodificar desde base64 a bytes y luego a string
-            encrypted_bytes = encrypted_password.encode('utf-8')
-            decoded_bytes = base64.b64decode(encrypted_bytes)
-            return decoded_bytes.decode('utf-8')
+            # Decodificar desde base64 (b64decode acepta str ASCII directamente)
+            return base64.b64decode(encrypted_password).decode('utf-8')
         except Exception:
             return encrypted_password  # Si hay error, devolver sin descifrar
 
@@ -391,14 +453,14 @@ class ConfigService:
             }
 
             # Obtener fecha actual
-            from datetime import datetime
             export_data["export_date"] = datetime.now().isoformat()
 
             if credentials and not include_passwords and "password" in credentials:
                 export_data["credentials"]["password"] = "***OCULTA***"
 
-            with open(export_path, "w", encoding="utf-8") as f:
-                json.dump(export_data, f, indent=4, ensure_ascii=False)
+            Path(export_path).write_bytes(
+                json.dumps(export_data, indent=4, ensure_ascii=False).encode("utf-8")
+            )
 
         except Exception as e:
             raise Exception(f"Error exportando configuración: {str(e)}")
@@ -418,8 +480,7 @@ class ConfigService:
             if not import_file.exists():
                 raise Exception(f"El archivo no existe: {import_path}")
 
-            with open(import_file, "r", encoding="utf-8") as f:
-                import_data = json.load(f)
+            import_data = json.loads(import_file.read_bytes())
 
             # Importar credenciales si existen
             if "credentials" in import_data and import_data["credentials"]:
@@ -441,6 +502,20 @@ class ConfigService:
             error_msg = str(e).encode('ascii', 'ignore').decode('ascii')
             raise Exception(f"Error importando configuracion: {error_msg}")
 
+    def _clean_dict(self, data):
+        """
+        Limpia los valores de texto de un diccionario
+
+        Args:
+            data (dict): Diccionario a limpiar
+
+        Returns:
+            dict: Nuevo diccionario con los strings limpios
+        """
+        clean = self._clean_string
+        return {key: clean(value) if isinstance(value, str) else value
+                for key, value in data.items()}
+
     def _clean_string(self, text):
         """
         Limpia un string de caracteres problemáticos para ASCII
@@ -455,12 +530,12 @@ class ConfigService:
             return ""
 
         try:
+            # Texto ASCII puro: no hay nada que limpiar
+            if text.isascii():
+                return text
+
             # Reemplazar caracteres problemáticos comunes
-            text = text.replace('\xa0', ' ')  # Espacio no-rompible
-            text = text.replace('\u2019', "'")  # Apostrofe curvo
-            text = text.replace('\u2018', "'")  # Apostrofe curvo
-            text = text.replace('\u201c', '"')  # Comilla curva
-            text = text.replace('\u201d', '"')  # Comilla curva
+            text = text.translate(self._TRANSLATE)
 
             # Codificar y decodificar para limpiar caracteres problemáticos
             return text.encode('ascii', 'ignore').decode('ascii')
@@ -5,18 +5,594 @@ Conecta con cuentas de email y busca correos basado en criterios definidos, sopo
 """
 
 import imaplib
-import email
+import logging
 import socket
+import ssl
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from email.header import decode_header
+from email.parser import BytesHeaderParser
+from functools import lru_cache
 import re
 
+logger = logging.getLogger(__name__)
+
+# Solo se descargan las cabeceras necesarias; PEEK evita marcar el correo como leido
+HEADER_FETCH = '(BODY.PEEK[HEADER.FIELDS (SUBJECT FROM DATE)])'
+SUBJECT_FETCH = '(BODY.PEEK[HEADER.FIELDS (SUBJECT)])'
+
+# Las respuestas FETCH solo traen cabeceras: no hace falta analizar el cuerpo
+_HEADER_PARSER = BytesHeaderParser()
+
+_WORD_RE = re.compile(r'\S{2,}')
+
+# Palabras de conexión que no se usan como términos de búsqueda
+STOP_WORDS = frozenset({'de', 'en', 'el', 'la', 'los', 'las', 'un', 'una', 'y', 'o', 'a', 'con', 'por', 'para'})
+
+_FETCH_UID_RE = re.compile(rb'UID (\d+)')
+_ESEARCH_COUNT_RE = re.compile(rb'\bCOUNT (\d+)')
+_ESEARCH_PARTIAL_RE = re.compile(rb'\bPARTIAL \(\S+ ([^)\s]+)\)')
+
+# Servidores IMAP conocidos por servidor SMTP exacto y por dominio
+IMAP_SERVER_MAPPING = {
+    "smtp.gmail.com": "imap.gmail.com",
+    "smtp-mail.outlook.com": "outlook.office365.com",
+    "smtp.mail.yahoo.com": "imap.mail.yahoo.com",
+    "smtp.office365.com": "outlook.office365.com"
+}
+IMAP_DOMAIN_MAPPING = {
+    "gmail": "imap.gmail.com",
+    "outlook": "outlook.office365.com",
+    "yahoo": "imap.mail.yahoo.com",
+    "office365": "outlook.office365.com"
+}
+_IMAP_DOMAIN_RE = re.compile('(' + '|'.join(IMAP_DOMAIN_MAPPING) + ')')
+
+# Meses en inglés exigidos por el formato de fecha IMAP y fechas SINCE ya calculadas
+_IMAP_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_DATE_CACHE = {}
+
+# Marcador de "versión del buzón aún no consultada" para la conexión actual
+_VERSION_UNKNOWN = object()
+
+# Respuestas no solicitadas que indican que INBOX cambió desde el SELECT
+_MAILBOX_CHANGES = ('EXISTS', 'RECENT', 'EXPUNGE', 'VANISHED')
+
+
+class _CleanTable(dict):
+    """
+    Tabla de str.translate que reemplaza caracteres problemáticos y elimina el
+    resto de caracteres no ASCII en una sola pasada
+
+    Cada carácter se resuelve la primera vez que aparece y queda memorizado, así
+    la tabla solo crece con los caracteres realmente vistos.
+    """
+
+    def __missing__(self, codepoint):
+        value = codepoint if codepoint < 128 else None
+        self[codepoint] = value
+        return value
+
+
+# Reemplazos de caracteres problemáticos usados por _clean_string
+_CLEAN_TABLE = _CleanTable(str.maketrans({
+    '\xa0': ' ',     # Espacio no-rompible
+    '\u2019': "'",   # Apostrofe curvo
+    '\u2018': "'",   # Apostrofe curvo
+    '\u201c': '"',   # Comilla curva
+    '\u201d': '"',   # Comilla curva
+}))
+
+# Reemplazos de caracteres problemáticos en títulos de búsqueda; a diferencia de
+# _CLEAN_TABLE se conservan las letras acentuadas (se buscan con CHARSET UTF-8)
+_TITLE_TABLE = str.maketrans({
+    '\xa0': ' ',     # Espacio no-rompible
+    '\u2019': "'",   # Apostrofe curvo
+    '\u2018': "'",   # Apostrofe curvo
+    '\u201c': '"',   # Comilla curva
+    '\u201d': '"',   # Comilla curva
+})
+
+# Cadenas entrecomilladas de un criterio IMAP (con comillas y barras escapadas)
+_QUOTED_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_QUOTED_ESCAPE_RE = re.compile(r'\\(.)')
+
+# Tamaño máximo de un literal no sincronizado con LITERAL- (RFC 7888)
+_LITERAL_MINUS_MAX = 4096
+
+
+def _decode_mime_words_uncached(s):
+    """
+    Decodifica palabras MIME codificadas (RFC 2047)
+
+    Args:
+        s (str): String a decodificar
+
+    Returns:
+        str: String decodificado
+    """
+    try:
+        decoded_fragments = decode_header(s)
+        decoded_string = ""
+
+        for fragment, encoding in decoded_fragments:
+            if isinstance(fragment, bytes):
+                if encoding:
+                    try:
+                        decoded_string += fragment.decode(encoding)
+                    except (UnicodeDecodeError, LookupError):
+                        decoded_string += fragment.decode('utf-8', 'ignore')
+                else:
+                    decoded_string += fragment.decode('utf-8', 'ignore')
+            else:
+                decoded_string += fragment
+
+        return decoded_string
+    except Exception:
+        return str(s)
+
+
+# Cache por valor de cabecera: la decodificación es pura y las cabeceras se repiten
+_decode_mime_words_cached = lru_cache(maxsize=4096)(_decode_mime_words_uncached)
+
+
+@lru_cache(maxsize=64)
+def _resolve_imap_server(smtp_server):
+    """
+    Determina el servidor IMAP basado en el servidor SMTP (resultado cacheado)
+
+    Args:
+        smtp_server (str): Servidor SMTP
+
+    Returns:
+        str: Servidor IMAP correspondiente
+    """
+    # Buscar mapeo directo
+    imap_server = IMAP_SERVER_MAPPING.get(smtp_server)
+    if imap_server:
+        return imap_server
+
+    # Intentar mapeo por dominio
+    match = _IMAP_DOMAIN_RE.search(smtp_server.lower())
+    if match:
+        return IMAP_DOMAIN_MAPPING[match.group(1)]
+
+    # Si no encuentra mapeo, intentar convertir smtp a imap
+    if smtp_server.startswith("smtp."):
+        return smtp_server.replace("smtp.", "imap.")
+
+    return None
+
+
+def _quote_imap(text):
+    """
+    Devuelve text como cadena entrecomillada IMAP, escapando comillas y barras
+
+    Args:
+        text (str): Término de búsqueda (los no ASCII se envían luego como literal)
+
+    Returns:
+        str: Cadena entre comillas válida para SEARCH
+    """
+    if '"' in text or '\\' in text:
+        text = text.replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _utf8_search_parts(criteria):
+    """
+    Separa un criterio con términos no ASCII en texto y literales UTF-8
+
+    Las cadenas entrecomilladas que contienen caracteres no ASCII se sustituyen
+    por literales (RFC 3501 solo admite ASCII en cadenas entrecomilladas).
+
+    Args:
+        criteria (str): Criterio de búsqueda IMAP
+
+    Returns:
+        list: Alterna texto ASCII (bytes) y literales (bytes): [texto, literal, texto, ...]
+    """
+    parts = []
+    position = 0
+    for match in _QUOTED_RE.finditer(criteria):
+        if match.group(1).isascii():
+            continue
+        parts.append(criteria[position:match.start()].encode('ascii'))
+        parts.append(_QUOTED_ESCAPE_RE.sub(r'\1', match.group(1)).encode('utf-8'))
+        position = match.end()
+
+    parts.append(criteria[position:].encode('ascii'))
+    return parts
+
+
+class _LiteralSender:
+    """
+    Envía los literales de un comando uno por uno tras cada respuesta de continuación
+
+    imaplib llama a next_chunk con cada continuación ('+'); cada trozo es un literal
+    seguido del resto de la línea de comando hasta el siguiente literal.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+
+    def next_chunk(self, continuation):
+        return next(self._chunks, b'')
+
+
+def _render_subject_criteria(groups):
+    """
+    Convierte los grupos de términos en un criterio IMAP de asunto (sin fecha)
+
+    Cada grupo exige todos sus términos; los grupos se combinan con OR.
+
+    Args:
+        groups (tuple): Grupos de términos no vacío
+
+    Returns:
+        str: Criterio de asunto IMAP
+    """
+    # Un solo grupo: los términos se combinan con el AND implícito de IMAP
+    if len(groups) == 1:
+        return ' '.join(f'SUBJECT {_quote_imap(term)}' for term in groups[0])
+
+    alternatives = []
+    for group in groups:
+        criteria = ' '.join(f'SUBJECT {_quote_imap(term)}' for term in group)
+        alternatives.append(f'({criteria})' if len(group) > 1 else criteria)
+
+    return 'OR ' * (len(alternatives) - 1) + ' '.join(alternatives)
+
+
+# Los mismos perfiles se buscan una y otra vez con la misma fecha: cachear el criterio
+@lru_cache(maxsize=512)
+def _render_search_criteria(groups, date_str):
+    """
+    Construye el criterio IMAP completo a partir de los grupos de términos
+
+    Args:
+        groups (tuple): Grupos de términos (tupla vacía = sin filtro de asunto)
+        date_str (str): Fecha desde la cual buscar
+
+    Returns:
+        str: Criterio de búsqueda IMAP
+    """
+    if not groups:
+        return f'SINCE "{date_str}"'
+
+    return f'({_render_subject_criteria(groups)} SINCE "{date_str}")'
+
+
+def _last_tokens(buffer, count):
+    """
+    Devuelve los últimos `count` elementos de una respuesta separada por espacios
+    recorriéndola desde el final, sin dividir el resto
+
+    Args:
+        buffer (bytes): UIDs separados por un espacio, sin espacios en los extremos
+        count (int): Número de elementos a devolver
+
+    Returns:
+        list: Últimos elementos (bytes) en su orden original
+    """
+    tokens = []
+    end = len(buffer)
+
+    for _ in range(count):
+        index = buffer.rfind(b' ', 0, end)
+        tokens.append(buffer[index + 1:end])
+        if index < 0:
+            break
+        end = index
+
+    tokens.reverse()
+    return tokens
+
+
+def _since_date(days_back):
+    """
+    Devuelve la fecha de inicio de búsqueda en formato IMAP (dd-Mon-YYYY)
+
+    El resultado se reutiliza durante un minuto por valor de days_back. Los meses
+    se escriben desde una tabla fija para no depender del locale de strftime.
+
+    Args:
+        days_back (int): Días hacia atrás
+
+    Returns:
+        str: Fecha para el criterio SINCE
+    """
+    now = time.monotonic()
+    cached = _DATE_CACHE.get(days_back)
+    if cached is not None and now - cached[0] < 60:
+        return cached[1]
+
+    start_date = datetime.now() - timedelta(days=days_back)
+    date_str = f"{start_date.day:02d}-{_IMAP_MONTHS[start_date.month - 1]}-{start_date.year}"
+    _DATE_CACHE[days_back] = (now, date_str)
+    return date_str
+
+
+def _compact_seqset(msg_uids):
+    """
+    Convierte una lista de UIDs en un conjunto IMAP compacto (p. ej. b'1,3:7,9')
+
+    Args:
+        msg_uids (list): UIDs (bytes) en orden ascendente
+
+    Returns:
+        bytes: Conjunto de secuencia IMAP
+    """
+    parts = []
+    numbers = [int(uid) for uid in msg_uids]
+    start = prev = numbers[0]
+
+    for number in numbers[1:]:
+        if number == prev + 1:
+            prev = number
+            continue
+        parts.append(f"{start}:{prev}" if start != prev else str(start))
+        start = prev = number
+
+    parts.append(f"{start}:{prev}" if start != prev else str(start))
+    return ",".join(parts).encode('ascii')
+
+
+def _split_seqset(seqset, max_length):
+    """
+    Divide un conjunto de secuencia IMAP en trozos que quepan en una línea de comando
+
+    Args:
+        seqset (bytes): Conjunto de secuencia (ver _compact_seqset)
+        max_length (int): Longitud máxima de cada trozo
+
+    Returns:
+        list: Conjuntos de secuencia (bytes) que juntos cubren el original
+    """
+    if len(seqset) <= max_length:
+        return [seqset]
+
+    chunks = []
+    current = []
+    length = -1
+    for part in seqset.split(b','):
+        if current and length + 1 + len(part) > max_length:
+            chunks.append(b','.join(current))
+            current = []
+            length = -1
+        current.append(part)
+        length += 1 + len(part)
+
+    chunks.append(b','.join(current))
+    return chunks
+
+
+class _ResumableIMAP4_SSL(imaplib.IMAP4_SSL):
+    """IMAP4_SSL que reutiliza una sesión TLS previa para abreviar el handshake"""
+
+    def __init__(self, host, ssl_context, session=None):
+        self._tls_session = session
+        self.mailbox_version = None
+        super().__init__(host, ssl_context=ssl_context)
+
+    def _create_socket(self, timeout):
+        sock = imaplib.IMAP4._create_socket(self, timeout)
+        return self.ssl_context.wrap_socket(sock, server_hostname=self.host,
+                                            session=self._tls_session)
+
+    def select_inbox(self):
+        """
+        Selecciona INBOX y guarda su versión a partir de la respuesta del SELECT
+
+        Con CONDSTORE el servidor incluye HIGHESTMODSEQ en la respuesta; sin ese
+        código (o con NOMODSEQ) la versión queda en None.
+
+        Returns:
+            tuple: (typ, data) de select()
+        """
+        typ, data = self.select('INBOX')
+        responses = self.untagged_responses
+
+        modseq = responses.pop('HIGHESTMODSEQ', [None])[-1]
+        uidvalidity = responses.pop('UIDVALIDITY', [None])[-1]
+        self.mailbox_version = (uidvalidity, modseq) if typ == 'OK' and modseq else None
+
+        # Las respuestas del propio SELECT no cuentan como cambios posteriores
+        for name in _MAILBOX_CHANGES:
+            responses.pop(name, None)
+        return typ, data
+
+    def mailbox_changed(self):
+        """Indica si el servidor notificó altas o bajas en INBOX desde el último SELECT"""
+        return any(name in self.untagged_responses for name in _MAILBOX_CHANGES)
+
+
+class _ImapPool:
+    """
+    Conexiones IMAP compartidas por todo el proceso, agrupadas por (servidor, email)
+
+    Cada conexión se entrega a un solo usuario a la vez (acquire/release), por lo
+    que la GUI y el programador pueden buscar en paralelo sin compartir sockets.
+    """
+
+    # Segundos que una conexión puede quedar inactiva antes de descartarla
+    # (los servidores suelen cortar a los 30 minutos)
+    IDLE_TIMEOUT = 25 * 60
+
+    def __init__(self, max_per_account=2):
+        self.max_per_account = max_per_account
+        # Conexiones libres por cuenta: [(conexion, password, ultimo_uso), ...]
+        self._idle = {}
+        # Contexto TLS compartido y última sesión TLS por servidor para reanudar
+        # conexiones; misma verificación que el contexto por defecto de imaplib
+        self.ssl_context = ssl._create_stdlib_context()
+        self._tls_sessions = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, password):
+        """
+        Entrega una conexión libre y viva de la cuenta, o None si hay que crear una
+
+        Args:
+            key (tuple): (servidor IMAP, email)
+            password (str): Contraseña actual de la cuenta
+
+        Returns:
+            imaplib.IMAP4_SSL: Conexión reutilizable o None
+        """
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    return None
+                connection, pooled_password, last_used = idle.pop()
+
+            # Descartar si cambió la contraseña o lleva demasiado tiempo inactiva
+            if pooled_password != password or time.monotonic() - last_used > self.IDLE_TIMEOUT:
+                self._logout(connection)
+                continue
+
+            # Comprobar que el servidor sigue respondiendo
+            try:
+                typ, _ = connection.noop()
+            except (imaplib.IMAP4.abort, imaplib.IMAP4.error, OSError):
+                typ = None
+
+            if typ == 'OK':
+                return connection
+
+            self._logout(connection)
+
+    def release(self, key, connection, password):
+        """
+        Devuelve una conexión al pool, cerrándola si la cuenta ya tiene suficientes libres
+
+        Args:
+            key (tuple): (servidor IMAP, email)
+            connection (imaplib.IMAP4_SSL): Conexión a devolver
+            password (str): Contraseña con la que se autenticó
+        """
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_account:
+                idle.append((connection, password, time.monotonic()))
+                return
+
+        self._logout(connection)
+
+    def get_tls_session(self, imap_server):
+        """Devuelve la última sesión TLS con el servidor, si existe"""
+        with self._lock:
+            return self._tls_sessions.get(imap_server)
+
+    def store_tls_session(self, imap_server, session):
+        """Guarda la sesión TLS de una conexión para reanudarla en la siguiente"""
+        with self._lock:
+            self._tls_sessions[imap_server] = session
+
+    @staticmethod
+    def _logout(connection):
+        try:
+            connection.logout()
+        except Exception:
+            pass
+
+
+_POOL = _ImapPool()
+
+
+class _SearchCache:
+    """
+    Resultados de búsqueda IMAP compartidos por todo el proceso, por (cuenta, criterio)
+
+    Con CONDSTORE un resultado es válido mientras no cambie la versión del buzón;
+    sin CONDSTORE se reutiliza durante TTL segundos.
+    """
+
+    MAX_SIZE = 256
+    TTL = 60
+
+    def __init__(self):
+        # (cuenta, criterio) -> (version_buzon, instante, valor)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, cache_key, version):
+        """
+        Devuelve el valor cacheado si sigue siendo válido
+
+        Args:
+            cache_key (tuple): (cuenta, criterio)
+            version (tuple): Versión actual del buzón o None sin CONDSTORE
+
+        Returns:
+            Valor cacheado o None
+        """
+        with self._lock:
+            cached = self._entries.get(cache_key)
+            if cached is None:
+                return None
+
+            cached_version, cached_at, value = cached
+            if version is not None:
+                is_valid = cached_version == version
+            else:
+                is_valid = cached_version is None and time.monotonic() - cached_at < self.TTL
+
+            if not is_valid:
+                return None
+
+            self._entries.move_to_end(cache_key)
+            return value
+
+    def put(self, cache_key, version, value):
+        """Guarda un resultado, descartando el menos usado si se supera MAX_SIZE"""
+        with self._lock:
+            self._entries[cache_key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(cache_key)
+            if len(self._entries) > self.MAX_SIZE:
+                self._entries.popitem(last=False)
+
+    def clear_account(self, account):
+        """Descarta los resultados cacheados de una cuenta"""
+        with self._lock:
+            for cache_key in [cache_key for cache_key in self._entries if cache_key[0] == account]:
+                del self._entries[cache_key]
+
+
+_SEARCH_CACHE = _SearchCache()
+
 
 class EmailSearchService:
+    # Longitud máxima del conjunto de UIDs de un FETCH de asuntos (los servidores
+    # deben aceptar líneas de al menos 8192 octetos); conjuntos más largos se piden
+    # en varios FETCH
+    MAX_UID_SET_LENGTH = 4000
+    # Máximo de títulos distintos con grupos de términos cacheados
+    SUBJECT_GROUPS_CACHE_SIZE = 256
+
     def __init__(self):
         """Inicializa el servicio de búsqueda de emails"""
         self.connection = None
         self.current_credentials = None
+        self.current_key = None
+        self._debug = False
+        # Grupos de términos ya calculados por título de búsqueda
+        self._subject_groups_cache = {}
+        self._mailbox_version = _VERSION_UNKNOWN
+
+    def set_debug(self, enabled):
+        """
+        Activa o desactiva el registro de depuración de los criterios de búsqueda
+
+        Args:
+            enabled (bool): True para registrar los criterios construidos
+        """
+        self._debug = bool(enabled)
 
     def search_by_profile(self, profile, credentials, days_back=30):
         """
@@ -43,8 +619,8 @@ class EmailSearchService:
             # Buscar correos usando búsqueda aproximada
             emails_found = self._search_emails_by_subject_flexible(search_title, days_back)
 
-            # Desconectar
-            self._disconnect_imap()
+            # Devolver la conexión al pool
+            self._release_imap()
 
             return True, emails_found, f"Busqueda completada. {emails_found} correos encontrados"
 
@@ -67,77 +643,65 @@ class EmailSearchService:
         """
         results = {}
 
+        def error_result(profile, message):
+            return {
+                "success": False,
+                "emails_found": 0,
+                "message": message,
+                "profile_name": profile["name"]
+            }
+
         try:
             # Conectar una vez para todos los perfiles
             success, message = self._connect_imap(credentials)
             if not success:
                 # Si no puede conectar, devolver error para todos los perfiles
                 for profile in profiles:
-                    results[profile["id"]] = {
-                        "success": False,
-                        "emails_found": 0,
-                        "message": f"Error conectando: {message}",
-                        "profile_name": profile["name"]
-                    }
+                    results[profile["id"]] = error_result(profile, f"Error conectando: {message}")
                 return results
 
-            # Buscar para cada perfil
+            # Filtrar perfiles y preparar sus criterios de asunto
+            pending = []
             for profile in profiles:
                 try:
                     if not profile.get("is_active", True):
-                        results[profile["id"]] = {
-                            "success": False,
-                            "emails_found": 0,
-                            "message": "Perfil inactivo",
-                            "profile_name": profile["name"]
-                        }
+                        results[profile["id"]] = error_result(profile, "Perfil inactivo")
                         continue
 
                     search_title = profile.get("search_title", "").strip()
                     if not search_title:
-                        results[profile["id"]] = {
-                            "success": False,
-                            "emails_found": 0,
-                            "message": "Perfil sin criterio de busqueda",
-                            "profile_name": profile["name"]
-                        }
+                        results[profile["id"]] = error_result(profile, "Perfil sin criterio de busqueda")
                         continue
 
-                    # Usar búsqueda flexible
-                    emails_found = self._search_emails_by_subject_flexible(search_title, days_back)
-
-                    results[profile["id"]] = {
-                        "success": True,
-                        "emails_found": emails_found,
-                        "message": f"Busqueda completada. {emails_found} correos encontrados",
-                        "profile_name": profile["name"]
-                    }
+                    pending.append((profile, self._get_subject_groups(search_title)))
 
                 except Exception as e:
                     error_msg = self._clean_string(str(e))
-                    results[profile["id"]] = {
-                        "success": False,
-                        "emails_found": 0,
-                        "message": f"Error en busqueda: {error_msg}",
-                        "profile_name": profile["name"]
-                    }
-
-            # Desconectar
-            self._disconnect_imap()
+                    results[profile["id"]] = error_result(profile, f"Error en busqueda: {error_msg}")
+
+            # Contar correos de todos los perfiles con una búsqueda combinada
+            counts = self._count_emails_by_groups([groups for _, groups in pending], days_back)
+
+            for (profile, _), emails_found in zip(pending, counts):
+                results[profile["id"]] = {
+                    "success": True,
+                    "emails_found": emails_found,
+                    "message": f"Busqueda completada. {emails_found} correos encontrados",
+                    "profile_name": profile["name"]
+                }
+
+            # Devolver la conexión al pool
+            self._release_imap()
 
         except Exception as e:
             self._disconnect_imap()
             error_msg = self._clean_string(str(e))
 
             # Si hay error general, aplicar a todos los perfiles no procesados
+            processed = set(results)
             for profile in profiles:
-                if profile["id"] not in results:
-                    results[profile["id"]] = {
-                        "success": False,
-                        "emails_found": 0,
-                        "message": f"Error general: {error_msg}",
-                        "profile_name": profile["name"]
-                    }
+                if profile["id"] not in processed:
+                    results[profile["id"]] = error_result(profile, f"Error general: {error_msg}")
 
         return results
 
@@ -167,8 +731,8 @@ class EmailSearchService:
             # Buscar y obtener detalles de correos usando búsqueda flexible
             emails = self._get_email_details_by_subject_flexible(search_title, days_back, limit)
 
-            # Desconectar
-            self._disconnect_imap()
+            # Devolver la conexión al pool
+            self._release_imap()
 
             return True, emails, f"Se obtuvieron {len(emails)} correos"
 
@@ -188,9 +752,10 @@ class EmailSearchService:
             tuple: (success: bool, message: str)
         """
         try:
-            success, message = self._connect_imap(credentials)
+            # Forzar un login real en lugar de reutilizar una conexión abierta
+            success, message = self._connect_imap(credentials, reuse=False)
             if success:
-                self._disconnect_imap()
+                self._release_imap()
                 return True, "Conexion IMAP exitosa"
             else:
                 return False, message
@@ -198,12 +763,13 @@ class EmailSearchService:
             error_msg = self._clean_string(str(e))
             return False, f"Error probando conexion IMAP: {error_msg}"
 
-    def _connect_imap(self, credentials):
+    def _connect_imap(self, credentials, reuse=True):
         """
-        Conecta al servidor IMAP
+        Conecta al servidor IMAP, reutilizando una conexión del pool si sigue viva
 
         Args:
             credentials (dict): Credenciales de email
+            reuse (bool): Si se permite reutilizar una conexión del pool
 
         Returns:
             tuple: (success: bool, message: str)
@@ -221,17 +787,39 @@ class EmailSearchService:
             if not imap_server:
                 return False, f"No se pudo determinar servidor IMAP para: {server}"
 
-            # Conectar
-            self.connection = imaplib.IMAP4_SSL(imap_server)
-            self.connection.login(email_addr, password)
+            key = (imap_server, email_addr)
+
+            # Reutilizar conexión del pool si sigue viva
+            connection = _POOL.acquire(key, password) if reuse else None
 
-            # Seleccionar buzón de entrada
-            self.connection.select('INBOX')
+            if connection is None:
+                # Conectar, reanudando la sesión TLS anterior con este servidor si existe
+                self.connection = _ResumableIMAP4_SSL(imap_server, _POOL.ssl_context,
+                                                      _POOL.get_tls_session(imap_server))
+                self.connection.login(email_addr, password)
 
+                # Con TLS 1.3 el ticket de sesión llega tras el handshake: guardarlo ahora
+                session = getattr(self.connection.sock, "session", None)
+                if session is not None:
+                    _POOL.store_tls_session(imap_server, session)
+
+                # Algunos servidores anuncian extensiones (CONDSTORE) solo tras autenticar
+                typ, data = self.connection.capability()
+                if typ == 'OK' and data and data[-1]:
+                    self.connection.capabilities = tuple(data[-1].decode('ascii', 'ignore').upper().split())
+
+                # Seleccionar buzón de entrada (la respuesta trae HIGHESTMODSEQ con CONDSTORE)
+                self.connection.select_inbox()
+            else:
+                self.connection = connection
+
+            self._mailbox_version = _VERSION_UNKNOWN
+            self.current_key = key
             self.current_credentials = credentials
             return True, "Conexion IMAP establecida"
 
         except imaplib.IMAP4.error as e:
+            self._disconnect_imap()
             error_msg = self._clean_string(str(e))
             return False, f"Error de autenticacion IMAP: {error_msg}"
         except socket.gaierror:
@@ -242,16 +830,35 @@ class EmailSearchService:
             error_msg = self._clean_string(str(e))
             return False, f"Error conectando IMAP: {error_msg}"
 
+    def _release_imap(self):
+        """Devuelve la conexión actual al pool para reutilizarla en la siguiente búsqueda"""
+        if self.connection:
+            password = self.current_credentials.get("password", "").strip()
+            _POOL.release(self.current_key, self.connection, password)
+
+        self.connection = None
+        self.current_key = None
+        self.current_credentials = None
+
     def _disconnect_imap(self):
-        """Desconecta del servidor IMAP"""
+        """Desconecta del servidor IMAP sin devolver la conexión al pool"""
         try:
             if self.connection:
-                self.connection.close()
+                _SEARCH_CACHE.clear_account(self.current_key)
+
+                # Sin buzón seleccionado (p. ej. tras fallar LOGIN o SELECT) close()
+                # falla; logout() debe ejecutarse igualmente para cerrar el socket
+                try:
+                    self.connection.close()
+                except Exception:
+                    pass
+
                 self.connection.logout()
         except Exception:
             pass
         finally:
             self.connection = None
+            self.current_key = None
             self.current_credentials = None
 
     def _search_emails_by_subject_flexible(self, search_title, days_back=30):
@@ -271,27 +878,19 @@ class EmailSearchService:
                 return 0
 
             # Calcular fecha de inicio
-            start_date = datetime.now() - timedelta(days=days_back)
-            date_str = start_date.strftime("%d-%b-%Y")
+            date_str = _since_date(days_back)
 
             # Construir criterio de búsqueda flexible
             search_criteria = self._build_flexible_search_criteria(search_title, date_str)
 
-            print(f"DEBUG: Criterio de búsqueda construido: {search_criteria}")
-
-            typ, msgnums = self.connection.search(None, search_criteria)
-
-            if typ != 'OK':
-                return 0
+            if __debug__ and self._debug:
+                logger.debug("Criterio de búsqueda construido: %s", search_criteria)
 
             # Contar correos encontrados
-            if msgnums[0]:
-                return len(msgnums[0].split())
-            else:
-                return 0
+            return self._count_search(search_criteria)
 
-        except Exception as e:
-            print(f"ERROR en búsqueda flexible: {e}")
+        except Exception:
+            logger.exception("Error en búsqueda flexible")
             return 0
 
     def _get_email_details_by_subject_flexible(self, search_title, days_back=30, limit=10):
@@ -313,58 +912,439 @@ class EmailSearchService:
                 return emails
 
             # Calcular fecha de inicio
-            start_date = datetime.now() - timedelta(days=days_back)
-            date_str = start_date.strftime("%d-%b-%Y")
+            date_str = _since_date(days_back)
 
             # Usar criterio de búsqueda flexible
             search_criteria = self._build_flexible_search_criteria(search_title, date_str)
-            typ, msgnums = self.connection.search(None, search_criteria)
+            # Obtener UIDs de los últimos N correos
+            msg_uids = self._search_last_uids(search_criteria, limit)
 
-            if typ != 'OK' or not msgnums[0]:
+            if not msg_uids:
                 return emails
 
-            # Obtener números de mensaje
-            msg_numbers = msgnums[0].split()
+            # Obtener detalles de todos los correos en una sola peticion
+            emails = self._fetch_email_headers(msg_uids)
 
-            # Limitar número de correos
-            msg_numbers = msg_numbers[-limit:]  # Últimos N correos
+        except Exception:
+            pass  # Si hay error general, devolver lo que se pudo obtener
 
-            # Obtener detalles de cada correo
-            for msg_num in msg_numbers:
-                try:
-                    typ, msg_data = self.connection.fetch(msg_num, '(RFC822)')
+        return emails
 
-                    if typ != 'OK':
-                        continue
+    def _fetch_email_headers(self, msg_uids):
+        """
+        Obtiene asunto, remitente y fecha de varios correos con un único UID FETCH
+
+        Args:
+            msg_uids (list): UIDs de los mensajes (bytes) a consultar
+
+        Returns:
+            list: Lista de correos con detalles, en el orden de msg_uids
+        """
+        if not msg_uids:
+            return []
+
+        typ, msg_data = self.connection.uid('FETCH', _compact_seqset(msg_uids), HEADER_FETCH)
+        if typ != 'OK':
+            return []
+
+        # La respuesta alterna tuplas (cabecera, contenido) con el cierre b')';
+        # el UID puede venir antes del literal o en el cierre
+        headers_by_uid = {}
+        for index, item in enumerate(msg_data):
+            if isinstance(item, tuple):
+                match = _FETCH_UID_RE.search(item[0])
+                if match is None and index + 1 < len(msg_data) and isinstance(msg_data[index + 1], bytes):
+                    match = _FETCH_UID_RE.search(msg_data[index + 1])
+                if match:
+                    headers_by_uid[match.group(1)] = item[1]
+
+        # Enlazar localmente las funciones usadas en cada iteración
+        parse = _HEADER_PARSER.parsebytes
+        decode = self._decode_mime_words
+        clean = self._clean_string
+        get_headers = headers_by_uid.get
 
-                    # Procesar mensaje
-                    email_message = email.message_from_bytes(msg_data[0][1])
+        emails = []
+        append = emails.append
+        for msg_uid in msg_uids:
+            header_bytes = get_headers(msg_uid)
+            if header_bytes is None:
+                continue
 
-                    # Extraer información básica
-                    subject = self._decode_mime_words(email_message.get("Subject", ""))
-                    sender = self._decode_mime_words(email_message.get("From", ""))
-                    date_str_email = email_message.get("Date", "")
+            try:
+                # Procesar cabeceras
+                email_message = parse(header_bytes)
 
-                    # Limpiar strings
-                    subject = self._clean_string(subject)
-                    sender = self._clean_string(sender)
+                # Extraer información básica
+                subject = decode(email_message.get("Subject", ""))
+                sender = decode(email_message.get("From", ""))
+                date_str_email = email_message.get("Date", "")
 
-                    email_info = {
-                        "subject": subject,
-                        "sender": sender,
-                        "date": date_str_email,
-                        "message_id": msg_num.decode() if isinstance(msg_num, bytes) else str(msg_num)
-                    }
+                append({
+                    "subject": clean(subject),
+                    "sender": clean(sender),
+                    "date": date_str_email,
+                    "message_id": msg_uid.decode()
+                })
 
-                    emails.append(email_info)
+            except Exception:
+                continue  # Si hay error con un correo, continuar con el siguiente
 
-                except Exception:
-                    continue  # Si hay error con un correo, continuar con el siguiente
+        return emails
+
+    def _count_emails_by_groups(self, groups_list, days_back=30):
+        """
+        Cuenta correos para varios perfiles con una sola búsqueda IMAP combinada
+
+        Se lanza un único SEARCH con el OR de todos los criterios y se descargan
+        los asuntos de los correos encontrados en un FETCH; cada perfil se cuenta
+        localmente con la misma comparación que SEARCH SUBJECT (subcadena sin
+        distinguir mayúsculas), de modo que el resultado de un perfil no depende
+        de qué otros perfiles se busquen a la vez.
+
+        Args:
+            groups_list (list): Grupos de términos de cada perfil (ver _build_subject_groups)
+            days_back (int): Días hacia atrás
+
+        Returns:
+            list: Número de correos encontrados por perfil, en el mismo orden
+
+        Raises:
+            imaplib.IMAP4.error: Si no hay conexión o el servidor rechaza la búsqueda
+        """
+        if not groups_list:
+            return []
+
+        if not self.connection:
+            raise imaplib.IMAP4.error("No hay conexion IMAP")
+
+        try:
+            date_str = _since_date(days_back)
+
+            # Algún perfil sin filtro de asunto: coincide con todo el rango de fechas
+            if not all(groups_list):
+                return [self._count_search(self._criteria_from_groups(groups, date_str))
+                        for groups in groups_list]
+
+            uids = self._search_uids(self._build_union_search_criteria(groups_list, date_str))
+            if uids is None:
+                raise imaplib.IMAP4.error("El servidor rechazo la busqueda combinada")
+            if not uids:
+                return [0] * len(groups_list)
+
+            subjects = self._fetch_subjects(uids.split())
+
+            counts = []
+            for groups in groups_list:
+                lowered = [[term.lower() for term in group] for group in groups]
+                counts.append(sum(
+                    1 for subject in subjects
+                    if any(all(term in subject for term in group) for group in lowered)
+                ))
+            return counts
 
         except Exception:
-            pass  # Si hay error general, devolver lo que se pudo obtener
+            logger.exception("Error en búsqueda combinada")
+            raise
 
-        return emails
+    def _build_union_search_criteria(self, groups_list, date_str):
+        """
+        Construye un único criterio IMAP que coincide con cualquiera de los perfiles
+
+        Args:
+            groups_list (list): Grupos de términos no vacíos de cada perfil
+            date_str (str): Fecha desde la cual buscar
+
+        Returns:
+            str: Criterio de búsqueda IMAP con el OR de todos los perfiles
+        """
+        alternatives = [f'({self._subject_criteria(groups)})' for groups in groups_list]
+        combined = 'OR ' * (len(alternatives) - 1) + ' '.join(alternatives)
+        return f'({combined} SINCE "{date_str}")'
+
+    def _count_search(self, search_criteria):
+        """
+        Ejecuta un SEARCH y devuelve el número de correos encontrados
+
+        Si ya hay una lista de UIDs válida en caché se cuenta directamente; si el
+        servidor soporta ESEARCH (RFC 4731) se pide solo el total con RETURN (COUNT)
+        en lugar de transferir todos los UIDs.
+
+        Args:
+            search_criteria (str): Criterio de búsqueda IMAP
+
+        Returns:
+            int: Número de correos encontrados
+        """
+        version = self._get_mailbox_version()
+        uids = _SEARCH_CACHE.get((self.current_key, search_criteria), version)
+
+        if uids is None and 'ESEARCH' in self.connection.capabilities:
+            count = self._esearch_count(search_criteria, version)
+            if count is not None:
+                return count
+
+        if uids is None:
+            uids = self._search_uids(search_criteria)
+
+        if not uids:
+            return 0
+
+        return uids.count(b' ') + 1
+
+    def _search_last_uids(self, search_criteria, limit):
+        """
+        Obtiene los UIDs de los últimos `limit` correos que cumplen el criterio
+
+        Si ya hay una lista de UIDs válida en caché se recorta; si el servidor
+        soporta PARTIAL (RFC 9394) solo se piden los últimos resultados con
+        RETURN (PARTIAL -1:-limit), sin transferir todos los UIDs.
+
+        Args:
+            search_criteria (str): Criterio de búsqueda IMAP
+            limit (int): Número máximo de correos
+
+        Returns:
+            list: UIDs (bytes) en orden ascendente
+        """
+        if limit <= 0:
+            return []
+
+        version = self._get_mailbox_version()
+        uids = _SEARCH_CACHE.get((self.current_key, search_criteria), version)
+
+        if uids is None and 'PARTIAL' in self.connection.capabilities:
+            msg_uids = self._esearch_partial(search_criteria, limit)
+            if msg_uids is not None:
+                return msg_uids
+
+        if uids is None:
+            uids = self._search_uids(search_criteria)
+
+        if not uids:
+            return []
+
+        return _last_tokens(uids, limit)
+
+    def _esearch_partial(self, search_criteria, limit):
+        """
+        Pide al servidor solo los últimos resultados con UID SEARCH RETURN (PARTIAL ...)
+
+        Args:
+            search_criteria (str): Criterio de búsqueda IMAP
+            limit (int): Número máximo de correos
+
+        Returns:
+            list: UIDs (bytes) en orden ascendente, o None si el servidor no respondió como se esperaba
+        """
+        try:
+            typ, data = self.connection._simple_command(
+                'UID', 'SEARCH', 'RETURN', f'(PARTIAL -1:-{limit})', *self._search_arguments(search_criteria)
+            )
+            if typ != 'OK':
+                return None
+            typ, data = self.connection._untagged_response(typ, data, 'ESEARCH')
+        except imaplib.IMAP4.abort:
+            raise
+        except imaplib.IMAP4.error:
+            return None
+
+        # El servidor siempre responde PARTIAL (NIL si no hay coincidencias);
+        # sin él la respuesta no es fiable y se repite la búsqueda sin RETURN
+        match = _ESEARCH_PARTIAL_RE.search(data[-1] or b'')
+        if not match:
+            return None
+        if match.group(1).upper() == b'NIL':
+            return []
+
+        msg_uids = []
+        try:
+            for part in match.group(1).split(b','):
+                first, _, last = part.partition(b':')
+                if last:
+                    low, high = sorted((int(first), int(last)))
+                    msg_uids.extend(str(uid).encode('ascii') for uid in range(low, high + 1))
+                else:
+                    msg_uids.append(str(int(first)).encode('ascii'))
+        except ValueError:
+            return None
+
+        msg_uids.sort(key=int)
+        return msg_uids[-limit:]
+
+    def _esearch_count(self, search_criteria, version):
+        """
+        Obtiene solo el número de coincidencias con UID SEARCH RETURN (COUNT)
+
+        Args:
+            search_criteria (str): Criterio de búsqueda IMAP
+            version (tuple): Versión actual del buzón o None
+
+        Returns:
+            int: Número de correos, o None si el servidor no respondió como se esperaba
+        """
+        cache_key = (self.current_key, search_criteria, 'COUNT')
+        count = _SEARCH_CACHE.get(cache_key, version)
+        if count is not None:
+            return count
+
+        try:
+            typ, data = self.connection._simple_command('UID', 'SEARCH', 'RETURN', '(COUNT)',
+                                                        *self._search_arguments(search_criteria))
+            if typ != 'OK':
+                return None
+            typ, data = self.connection._untagged_response(typ, data, 'ESEARCH')
+        except imaplib.IMAP4.abort:
+            raise
+        except imaplib.IMAP4.error:
+            return None
+
+        # COUNT se devuelve siempre (0 sin coincidencias); sin él la respuesta
+        # no es fiable y se repite la búsqueda sin RETURN
+        match = _ESEARCH_COUNT_RE.search(data[-1] or b'')
+        if not match:
+            return None
+        count = int(match.group(1))
+
+        _SEARCH_CACHE.put(cache_key, version, count)
+        return count
+
+    def _search_uids(self, search_criteria):
+        """
+        Ejecuta un UID SEARCH, reutilizando el resultado anterior si sigue siendo válido
+
+        Con CONDSTORE el buzón expone HIGHESTMODSEQ, que cambia con cualquier
+        modificación; si coincide con el de la búsqueda anterior el resultado sigue
+        siendo válido y se evita que el servidor vuelva a recorrer el buzón. Sin
+        CONDSTORE el resultado se reutiliza durante _SearchCache.TTL segundos, de
+        modo que "buscar" seguido de "ver detalles" cuesta un solo SEARCH. La caché
+        es común a todas las instancias del servicio.
+
+        Args:
+            search_criteria (str): Criterio de búsqueda IMAP
+
+        Returns:
+            bytes: UIDs separados por espacios (b'' si no hay resultados), o None si falla
+        """
+        version = self._get_mailbox_version()
+        cache_key = (self.current_key, search_criteria)
+
+        cached_uids = _SEARCH_CACHE.get(cache_key, version)
+        if cached_uids is not None:
+            return cached_uids
+
+        typ, data = self.connection.uid('SEARCH', *self._search_arguments(search_criteria))
+        if typ != 'OK':
+            return None
+
+        # Normalizar espacios para poder contar resultados sin dividir la respuesta
+        uids = (data[0] or b'').strip()
+
+        _SEARCH_CACHE.put(cache_key, version, uids)
+        return uids
+
+    def _search_arguments(self, search_criteria):
+        """
+        Prepara los argumentos de UID SEARCH a continuación de RETURN (si lo hay)
+
+        Un criterio ASCII se envía tal cual. Si contiene términos no ASCII se
+        declara CHARSET UTF-8 y esos términos viajan como literales: no
+        sincronizados si el servidor anuncia LITERAL+ (o LITERAL- y caben), o
+        enviados tras cada continuación del servidor en caso contrario.
+
+        Args:
+            search_criteria (str): Criterio de búsqueda IMAP
+
+        Returns:
+            tuple: Argumentos para el comando
+        """
+        if search_criteria.isascii():
+            return (None, search_criteria)
+
+        parts = _utf8_search_parts(search_criteria)
+        literals = parts[1::2]
+        capabilities = self.connection.capabilities
+
+        if 'LITERAL+' in capabilities or (
+                'LITERAL-' in capabilities and max(map(len, literals)) <= _LITERAL_MINUS_MAX):
+            command = parts[0]
+            for literal, text in zip(literals, parts[2::2]):
+                command += b'{%d+}\r\n' % len(literal) + literal + text
+            return ('CHARSET', 'UTF-8', command)
+
+        # imaplib envía la primera línea y pide cada literal al recibir '+'
+        chunks = []
+        for index, literal in enumerate(literals):
+            chunk = literal + parts[2 * index + 2]
+            if index + 1 < len(literals):
+                chunk += b'{%d}' % len(literals[index + 1])
+            chunks.append(chunk)
+
+        self.connection.literal = _LiteralSender(chunks).next_chunk
+        return ('CHARSET', 'UTF-8', parts[0] + b'{%d}' % len(literals[0]))
+
+    def _get_mailbox_version(self):
+        """
+        Obtiene un identificador del estado actual de INBOX si el servidor soporta CONDSTORE
+
+        Se toma de la respuesta del SELECT (no se envía STATUS sobre el buzón
+        seleccionado, RFC 3501 6.3.10). Si desde entonces el servidor notificó
+        altas o bajas (p. ej. en el NOOP del pool) se vuelve a seleccionar INBOX.
+        Se consulta una sola vez por uso de la conexión.
+
+        Returns:
+            tuple: (UIDVALIDITY, HIGHESTMODSEQ) o None si no está disponible
+        """
+        if self._mailbox_version is not _VERSION_UNKNOWN:
+            return self._mailbox_version
+
+        version = None
+        try:
+            if 'CONDSTORE' in self.connection.capabilities:
+                if self.connection.mailbox_changed():
+                    typ, _ = self.connection.select_inbox()
+                    if typ != 'OK':
+                        raise imaplib.IMAP4.error("No se pudo volver a seleccionar INBOX")
+                version = self.connection.mailbox_version
+        except Exception:
+            version = None
+
+        self._mailbox_version = version
+        return version
+
+    def _fetch_subjects(self, msg_uids):
+        """
+        Obtiene los asuntos decodificados y en minúsculas de varios correos
+
+        Se usa un único UID FETCH salvo que el conjunto de UIDs no quepa en una
+        línea de comando (ver MAX_UID_SET_LENGTH).
+
+        Args:
+            msg_uids (list): UIDs de los mensajes (bytes)
+
+        Returns:
+            list: Asuntos en minúsculas
+
+        Raises:
+            imaplib.IMAP4.error: Si el servidor rechaza el FETCH
+        """
+        parse = _HEADER_PARSER.parsebytes
+        decode = self._decode_mime_words
+
+        subjects = []
+        append = subjects.append
+        for seqset in _split_seqset(_compact_seqset(msg_uids), self.MAX_UID_SET_LENGTH):
+            typ, msg_data = self.connection.uid('FETCH', seqset, SUBJECT_FETCH)
+            if typ != 'OK':
+                raise imaplib.IMAP4.error("El servidor rechazo la descarga de asuntos")
+
+            for item in msg_data:
+                if isinstance(item, tuple):
+                    email_message = parse(item[1])
+                    # Desplegar cabeceras multilínea como hace el servidor al comparar
+                    subject = str(email_message.get("Subject", "")).replace('\r\n', '').replace('\n', '')
+                    append(decode(subject).lower())
+        return subjects
 
     def _build_flexible_search_criteria(self, search_title, date_str):
         """
@@ -377,85 +1357,110 @@ class EmailSearchService:
         Returns:
             str: Criterio de búsqueda IMAP
         """
+        return self._criteria_from_groups(self._get_subject_groups(search_title), date_str)
+
+    def _get_subject_groups(self, search_title):
+        """
+        Devuelve los grupos de términos de un título, calculándolos solo la primera vez
+
+        Args:
+            search_title (str): Título/criterio de búsqueda
+
+        Returns:
+            tuple: Grupos de términos (ver _build_subject_groups)
+        """
+        groups = self._subject_groups_cache.get(search_title)
+        if groups is None:
+            if len(self._subject_groups_cache) >= self.SUBJECT_GROUPS_CACHE_SIZE:
+                self._subject_groups_cache.clear()
+            groups = self._build_subject_groups(search_title)
+            self._subject_groups_cache[search_title] = groups
+        return groups
+
+    def _criteria_from_groups(self, groups, date_str):
+        """
+        Construye el criterio IMAP completo a partir de los grupos de términos
+
+        Args:
+            groups (tuple): Grupos de términos (ver _build_subject_groups)
+            date_str (str): Fecha desde la cual buscar
+
+        Returns:
+            str: Criterio de búsqueda IMAP
+        """
+        return _render_search_criteria(groups, date_str)
+
+    def _subject_criteria(self, groups):
+        """
+        Convierte los grupos de términos en un criterio IMAP de asunto (sin fecha)
+
+        Args:
+            groups (tuple): Grupos de términos no vacío
+
+        Returns:
+            str: Criterio de asunto IMAP
+        """
+        return _render_subject_criteria(groups)
+
+    def _build_subject_groups(self, search_title):
+        """
+        Determina los términos de asunto a buscar para un título, con soporte para
+        espacios, timestamps y texto adicional
+
+        Args:
+            search_title (str): Título/criterio de búsqueda
+
+        Returns:
+            tuple: Grupos alternativos de términos; un correo coincide si su asunto
+                   contiene todos los términos de algún grupo. Tupla vacía = sin filtro
+        """
+        clean_title = ""
         try:
             # Limpiar y preparar el criterio de búsqueda
-            clean_title = self._clean_string(search_title.strip())
+            clean_title = self._clean_search_title(search_title.strip())
 
             if not clean_title:
-                return f'SINCE "{date_str}"'
+                return ()
 
             # ESTRATEGIA MEJORADA: Combinación de múltiples aproximaciones
             if ' ' in clean_title:
-                # Dividir en palabras significativas (filtrar palabras muy cortas y comunes)
-                all_words = clean_title.split()
-
-                # Filtrar palabras significativas (>=2 chars y no palabras de conexión comunes)
-                stop_words = {'de', 'en', 'el', 'la', 'los', 'las', 'un', 'una', 'y', 'o', 'a', 'con', 'por', 'para'}
-                significant_words = []
+                # Palabras de al menos 2 caracteres en una sola pasada
+                candidate_words = _WORD_RE.findall(clean_title)
 
-                for word in all_words:
-                    clean_word = word.strip().lower()
-                    if len(clean_word) >= 2 and clean_word not in stop_words:
-                        significant_words.append(word.strip())
+                # Filtrar palabras de conexión comunes
+                significant_words = [word for word in candidate_words if word.lower() not in STOP_WORDS]
 
-                if len(significant_words) == 0:
+                if not significant_words:
                     # Si no hay palabras significativas, usar todas las palabras >= 2 chars
-                    significant_words = [word.strip() for word in all_words if len(word.strip()) >= 2]
+                    significant_words = candidate_words
 
                 if len(significant_words) == 1:
                     # Solo una palabra significativa
-                    return f'(SUBJECT "{significant_words[0]}" SINCE "{date_str}")'
+                    return ((significant_words[0],),)
 
                 elif len(significant_words) > 1:
-                    # ESTRATEGIA MÚLTIPLE para encontrar correos con timestamps y texto adicional
-
-                    # Opción 1: Buscar frase completa (más específico)
-                    phrase_criteria = f'SUBJECT "{clean_title}"'
-
-                    # Opción 2: Buscar todas las palabras significativas (más flexible)
-                    word_criteria = []
-                    for word in significant_words:
-                        word_criteria.append(f'SUBJECT "{word}"')
-                    words_criteria = ' '.join(word_criteria)
-
-                    # Opción 3: Buscar combinaciones de palabras clave (ultra flexible)
-                    # Tomar las 2-3 palabras más importantes para casos con muchos timestamps/texto extra
-                    key_words = significant_words[:3]  # Máximo 3 palabras clave
-                    key_criteria = []
-                    for word in key_words:
-                        key_criteria.append(f'SUBJECT "{word}"')
-                    key_words_criteria = ' '.join(key_criteria)
-
-                    # CRITERIO FINAL: Combinar estrategias con OR para máxima flexibilidad
-                    # Esto encontrará correos que:
-                    # 1. Contengan la frase exacta, O
-                    # 2. Contengan todas las palabras significativas, O
-                    # 3. Contengan al menos las palabras clave principales
-                    if len(significant_words) <= 3:
-                        # Pocas palabras: usar estrategia 1 y 2
-                        combined_criteria = f'OR {phrase_criteria} ({words_criteria})'
-                    else:
-                        # Muchas palabras: usar todas las estrategias
-                        combined_criteria = f'OR OR {phrase_criteria} ({words_criteria}) ({key_words_criteria})'
-
-                    return f'({combined_criteria} SINCE "{date_str}")'
+                    # Un asunto con la frase exacta contiene todas sus palabras, y uno con
+                    # todas las palabras contiene las palabras clave: el OR de las tres
+                    # estrategias (frase, todas las palabras, palabras clave) equivale a
+                    # exigir solo las palabras clave principales (máximo 3)
+                    return (tuple(significant_words[:3]),)
                 else:
                     # No hay palabras válidas
-                    return f'SINCE "{date_str}"'
+                    return ()
             else:
                 # Palabra única, búsqueda directa
-                return f'(SUBJECT "{clean_title}" SINCE "{date_str}")'
+                return ((clean_title,),)
 
-        except Exception as e:
-            print(f"ERROR construyendo criterio de búsqueda: {e}")
+        except Exception:
+            logger.exception("Error construyendo criterio de búsqueda")
             # Fallback a búsqueda básica por primera palabra significativa
             try:
                 first_word = clean_title.split()[0] if clean_title.split() else ""
                 if first_word and len(first_word) >= 2:
-                    return f'(SUBJECT "{first_word}" SINCE "{date_str}")'
+                    return ((first_word,),)
             except:
                 pass
-            return f'SINCE "{date_str}"'
+            return ()
 
     def _search_emails_by_subject(self, search_title, days_back=30):
         """
@@ -467,22 +1472,13 @@ class EmailSearchService:
                 return 0
 
             # Calcular fecha de inicio
-            start_date = datetime.now() - timedelta(days=days_back)
-            date_str = start_date.strftime("%d-%b-%Y")
+            date_str = _since_date(days_back)
 
             # Buscar correos con el criterio de asunto y fecha (MÉTODO ORIGINAL)
-            search_criteria = f'(SUBJECT "{search_title}" SINCE "{date_str}")'
-
-            typ, msgnums = self.connection.search(None, search_criteria)
-
-            if typ != 'OK':
-                return 0
+            search_criteria = f'(SUBJECT {_quote_imap(search_title)} SINCE "{date_str}")'
 
             # Contar correos encontrados
-            if msgnums[0]:
-                return len(msgnums[0].split())
-            else:
-                return 0
+            return self._count_search(search_criteria)
 
         except Exception:
             return 0
@@ -499,53 +1495,18 @@ class EmailSearchService:
                 return emails
 
             # Calcular fecha de inicio
-            start_date = datetime.now() - timedelta(days=days_back)
-            date_str = start_date.strftime("%d-%b-%Y")
+            date_str = _since_date(days_back)
 
             # Buscar correos (MÉTODO ORIGINAL)
-            search_criteria = f'(SUBJECT "{search_title}" SINCE "{date_str}")'
-            typ, msgnums = self.connection.search(None, search_criteria)
+            search_criteria = f'(SUBJECT {_quote_imap(search_title)} SINCE "{date_str}")'
+            # Obtener UIDs de los últimos N correos
+            msg_uids = self._search_last_uids(search_criteria, limit)
 
-            if typ != 'OK' or not msgnums[0]:
+            if not msg_uids:
                 return emails
 
-            # Obtener números de mensaje
-            msg_numbers = msgnums[0].split()
-
-            # Limitar número de correos
-            msg_numbers = msg_numbers[-limit:]  # Últimos N correos
-
-            # Obtener detalles de cada correo
-            for msg_num in msg_numbers:
-                try:
-                    typ, msg_data = self.connection.fetch(msg_num, '(RFC822)')
-
-                    if typ != 'OK':
-                        continue
-
-                    # Procesar mensaje
-                    email_message = email.message_from_bytes(msg_data[0][1])
-
-                    # Extraer información básica
-                    subject = self._decode_mime_words(email_message.get("Subject", ""))
-                    sender = self._decode_mime_words(email_message.get("From", ""))
-                    date_str_email = email_message.get("Date", "")
-
-                    # Limpiar strings
-                    subject = self._clean_string(subject)
-                    sender = self._clean_string(sender)
-
-                    email_info = {
-                        "subject": subject,
-                        "sender": sender,
-                        "date": date_str_email,
-                        "message_id": msg_num.decode() if isinstance(msg_num, bytes) else str(msg_num)
-                    }
-
-                    emails.append(email_info)
-
-                except Exception:
-                    continue  # Si hay error con un correo, continuar con el siguiente
+            # Obtener detalles de todos los correos en una sola peticion
+            emails = self._fetch_email_headers(msg_uids)
 
         except Exception:
             pass  # Si hay error general, devolver lo que se pudo obtener
@@ -562,35 +1523,7 @@ class EmailSearchService:
         Returns:
             str: Servidor IMAP correspondiente
         """
-        imap_mapping = {
-            "smtp.gmail.com": "imap.gmail.com",
-            "smtp-mail.outlook.com": "outlook.office365.com",
-            "smtp.mail.yahoo.com": "imap.mail.yahoo.com",
-            "smtp.office365.com": "outlook.office365.com"
-        }
-
-        # Buscar mapeo directo
-        if smtp_server in imap_mapping:
-            return imap_mapping[smtp_server]
-
-        # Intentar mapeo por dominio
-        domain_mapping = {
-            "gmail": "imap.gmail.com",
-            "outlook": "outlook.office365.com",
-            "yahoo": "imap.mail.yahoo.com",
-            "office365": "outlook.office365.com"
-        }
-
-        smtp_lower = smtp_server.lower()
-        for domain, imap_server in domain_mapping.items():
-            if domain in smtp_lower:
-                return imap_server
-
-        # Si no encuentra mapeo, intentar convertir smtp a imap
-        if smtp_server.startswith("smtp."):
-            return smtp_server.replace("smtp.", "imap.")
-
-        return None
+        return _resolve_imap_server(smtp_server)
 
     def _decode_mime_words(self, s):
         """
@@ -605,25 +1538,30 @@ class EmailSearchService:
         if not s:
             return ""
 
-        try:
-            decoded_fragments = decode_header(s)
-            decoded_string = ""
-
-            for fragment, encoding in decoded_fragments:
-                if isinstance(fragment, bytes):
-                    if encoding:
-                        try:
-                            decoded_string += fragment.decode(encoding)
-                        except (UnicodeDecodeError, LookupError):
-                            decoded_string += fragment.decode('utf-8', 'ignore')
-                    else:
-                        decoded_string += fragment.decode('utf-8', 'ignore')
-                else:
-                    decoded_string += fragment
+        if isinstance(s, str):
+            # Sin palabras codificadas (=?...?=) no hay nada que decodificar
+            if "=?" not in s:
+                return s
 
-            return decoded_string
-        except Exception:
-            return str(s)
+            # Los remitentes y asuntos se repiten mucho: usar la versión cacheada
+            return _decode_mime_words_cached(s)
+
+        return _decode_mime_words_uncached(s)
+
+    def _clean_search_title(self, text):
+        """
+        Limpia un título de búsqueda conservando las letras acentuadas
+
+        Args:
+            text (str): Título a limpiar
+
+        Returns:
+            str: Título con caracteres problemáticos reemplazados y en forma NFC
+        """
+        if not text or text.isascii():
+            return text or ""
+
+        return unicodedata.normalize('NFC', text.translate(_TITLE_TABLE))
 
     def _clean_string(self, text):
         """
@@ -639,14 +1577,11 @@ class EmailSearchService:
             return ""
 
         try:
-            # Reemplazar caracteres problemáticos comunes
-            text = text.replace('\xa0', ' ')  # Espacio no-rompible
-            text = text.replace('\u2019', "'")  # Apostrofe curvo
-            text = text.replace('\u2018', "'")  # Apostrofe curvo
-            text = text.replace('\u201c', '"')  # Comilla curva
-            text = text.replace('\u201d', '"')  # Comilla curva
-
-            # Codificar y decodificar para limpiar caracteres problemáticos
-            return text.encode('ascii', 'ignore').decode('ascii')
+            # Texto ASCII: no hay nada que limpiar
+            if text.isascii():
+                return text
+
+            # Reemplazar caracteres problemáticos y descartar el resto de no ASCII
+            return text.translate(_CLEAN_TABLE)
         except Exception:
             return str(text)
\ No newline at end of file
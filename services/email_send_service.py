@@ -4,17 +4,205 @@ Servicio para envío de correos con adjuntos de reportes Excel.
 Maneja el envío automático de reportes generados por correo electrónico.
 """
 
+import atexit
+import base64
+import mmap
+import re
 import smtplib
 import socket
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
-from email import encoders
 from pathlib import Path
 from datetime import datetime
 
+# Formato básico de email; \Z evita aceptar un salto de línea final como hace $
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\Z')
+
+# Direcciones resueltas por servidor SMTP: (servidor, puerto) -> (direcciones, caducidad)
+_DNS_TTL = 5 * 60
+_DNS_CACHE = {}
+_DNS_LOCK = threading.Lock()
+
+
+def _resolve_smtp_server(host, port):
+    """
+    Resuelve el servidor SMTP reutilizando la respuesta durante _DNS_TTL segundos
+
+    Args:
+        host (str): Servidor SMTP
+        port (int): Puerto SMTP
+
+    Returns:
+        list: Direcciones IP del servidor, en el orden de getaddrinfo
+
+    Raises:
+        socket.gaierror: Si el nombre no se puede resolver
+    """
+    now = time.monotonic()
+    with _DNS_LOCK:
+        cached = _DNS_CACHE.get((host, port))
+        if cached and cached[1] > now:
+            return cached[0]
+
+    addresses = []
+    for *_, sockaddr in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM):
+        if sockaddr[0] not in addresses:
+            addresses.append(sockaddr[0])
+
+    with _DNS_LOCK:
+        _DNS_CACHE[(host, port)] = (addresses, now + _DNS_TTL)
+    return addresses
+
+
+class _CachedDnsSMTP(smtplib.SMTP):
+    """SMTP que conecta usando las direcciones cacheadas del servidor"""
+
+    def _get_socket(self, host, port, timeout):
+        for address in _resolve_smtp_server(host, port):
+            try:
+                return socket.create_connection((address, port), timeout, self.source_address)
+            except OSError:
+                continue
+
+        # Ninguna dirección cacheada responde: puede que hayan cambiado, resolver de nuevo
+        with _DNS_LOCK:
+            _DNS_CACHE.pop((host, port), None)
+        return super()._get_socket(host, port, timeout)
+
+
+class _SmtpPool:
+    """
+    Conexiones SMTP autenticadas compartidas por todo el proceso, agrupadas por
+    (servidor, puerto, email)
+
+    Cada conexión se entrega a un solo usuario a la vez (acquire/release), así
+    varios envíos seguidos pagan una sola vez el saludo, STARTTLS y el login.
+    """
+
+    # Segundos que una conexión puede quedar inactiva antes de descartarla
+    # (los servidores SMTP suelen cortar a los pocos minutos)
+    IDLE_TIMEOUT = 4 * 60
+    # Mensajes y segundos de vida máximos por conexión antes de renovarla; los
+    # proveedores rechazan o cortan las sesiones que superan su límite (Gmail: 100)
+    MAX_MESSAGES = 100
+    MAX_AGE = 30 * 60
+
+    def __init__(self, max_per_account=2):
+        self.max_per_account = max_per_account
+        # Conexiones libres por cuenta:
+        # [(conexion, password, ultimo_uso, enviados, apertura), ...]
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, password):
+        """
+        Entrega una conexión libre y viva de la cuenta, o None si hay que crear una
+
+        Args:
+            key (tuple): (servidor SMTP, puerto, email)
+            password (str): Contraseña actual de la cuenta
+
+        Returns:
+            tuple: (conexion, enviados, apertura) reutilizable o None
+        """
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    return None
+                server, pooled_password, last_used, sent, opened_at = idle.pop()
+
+            # Descartar si cambió la contraseña o lleva demasiado tiempo inactiva
+            if pooled_password != password or time.monotonic() - last_used > self.IDLE_TIMEOUT:
+                self._quit(server)
+                continue
+
+            # Comprobar que el servidor sigue respondiendo
+            try:
+                code, _ = server.noop()
+            except (smtplib.SMTPException, OSError):
+                code = None
+
+            if code == 250:
+                return server, sent, opened_at
+
+            self._quit(server)
+
+    def release(self, key, server, password, sent, opened_at):
+        """
+        Devuelve una conexión al pool, cerrándola si la cuenta ya tiene suficientes
+        libres o si la conexión alcanzó su límite de mensajes o de vida
+
+        Args:
+            key (tuple): (servidor SMTP, puerto, email)
+            server (smtplib.SMTP): Conexión a devolver
+            password (str): Contraseña con la que se autenticó
+            sent (int): Mensajes enviados por la conexión
+            opened_at (float): Instante (time.monotonic) en que se abrió
+        """
+        now = time.monotonic()
+        if sent < self.MAX_MESSAGES and now - opened_at < self.MAX_AGE:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_per_account:
+                    idle.append((server, password, now, sent, opened_at))
+                    return
+
+        self._quit(server)
+
+    def close_all(self):
+        """Cierra todas las conexiones libres (se llama al salir del proceso)"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+
+        for connections in idle.values():
+            for server, *_ in connections:
+                self._quit(server)
+
+    @staticmethod
+    def _quit(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+
+_POOL = _SmtpPool()
+atexit.register(_POOL.close_all)
+
+# ConfigService compartido por todo el proceso: conserva entre envíos sus cachés
+# de credenciales y configuración (invalidadas por fecha y tamaño del archivo)
+_config_service = None
+_config_service_lock = threading.Lock()
+
+
+def _get_config_service():
+    """Devuelve el ConfigService compartido, creándolo en el primer uso"""
+    global _config_service
+
+    with _config_service_lock:
+        if _config_service is None:
+            from services.config_service import ConfigService
+            _config_service = ConfigService()
+        return _config_service
+
 
 class EmailSendService:
+    # Reemplazos de caracteres problemáticos comunes (una sola pasada con str.translate)
+    _TRANSLATE = str.maketrans({
+        '\xa0': ' ',  # Espacio no-rompible
+        '\u2019': "'",  # Apostrofe curvo
+        '\u2018': "'",  # Apostrofe curvo
+        '\u201c': '"',  # Comilla curva
+        '\u201d': '"'  # Comilla curva
+    })
+
     def __init__(self):
         """Inicializa el servicio de envío de emails"""
         pass
@@ -31,44 +219,17 @@ class EmailSendService:
             tuple: (success: bool, message: str)
         """
         try:
-            from services.config_service import ConfigService
-            config_service = ConfigService()
-
-            # Verificar que existan credenciales SMTP
-            if not config_service.credentials_exist():
-                return False, "No hay credenciales SMTP configuradas"
-
-            # Cargar credenciales SMTP
-            smtp_credentials = config_service.load_credentials()
-            if not smtp_credentials:
-                return False, "No se pudieron cargar las credenciales SMTP"
-
-            # Cargar configuración de envío si no se proporciona
-            if not email_config:
-                email_config = config_service.load_email_send_config()
+            error, settings = self._load_report_settings(email_config)
+            if error:
+                return False, error
 
-            if not email_config or not email_config.get("enabled", False):
-                return False, "Configuracion de envio no esta habilitada"
+            smtp_credentials, subject, recipient, cc_list = settings
 
             # Validar archivo de reporte
             report_path = Path(report_file_path)
             if not report_path.exists():
                 return False, f"El archivo de reporte no existe: {report_file_path}"
 
-            # Preparar datos del email
-            subject = email_config.get("subject", "Reporte de Registros de Bot - OpoBot")
-            recipient = email_config.get("recipient", "").strip()
-            cc_emails = email_config.get("cc", "").strip()
-
-            if not recipient:
-                return False, "No hay destinatario configurado"
-
-            # Preparar lista de destinatarios
-            recipients = [recipient]
-            cc_list = []
-            if cc_emails:
-                cc_list = [email.strip() for email in cc_emails.split(',') if email.strip()]
-
             # Crear mensaje
             success, message = self._create_and_send_message(
                 smtp_credentials, subject, recipient, cc_list, report_path
@@ -80,6 +241,84 @@ class EmailSendService:
             error_msg = self._clean_string(str(e))
             return False, f"Error enviando reporte: {error_msg}"
 
+    def send_reports_batch(self, report_file_paths, email_config=None):
+        """
+        Envía varios reportes cargando la configuración una sola vez
+
+        Los envíos reutilizan la misma conexión SMTP autenticada del pool.
+
+        Args:
+            report_file_paths (list): Rutas de los archivos de reporte a enviar
+            email_config (dict, optional): Configuración específica de envío
+
+        Returns:
+            list: [(success: bool, message: str), ...] en el mismo orden que las rutas
+        """
+        try:
+            error, settings = self._load_report_settings(email_config)
+        except Exception as e:
+            error_msg = self._clean_string(str(e))
+            error = f"Error enviando reporte: {error_msg}"
+
+        if error:
+            return [(False, error) for _ in report_file_paths]
+
+        smtp_credentials, subject, recipient, cc_list = settings
+
+        results = []
+        for report_file_path in report_file_paths:
+            report_path = Path(report_file_path)
+            if not report_path.exists():
+                results.append((False, f"El archivo de reporte no existe: {report_file_path}"))
+                continue
+
+            results.append(self._create_and_send_message(
+                smtp_credentials, subject, recipient, cc_list, report_path
+            ))
+
+        return results
+
+    def _load_report_settings(self, email_config=None):
+        """
+        Carga credenciales SMTP y datos de envío de reportes
+
+        Args:
+            email_config (dict, optional): Configuración específica de envío
+
+        Returns:
+            tuple: (error: str o None, (smtp_credentials, subject, recipient, cc_list))
+        """
+        config_service = _get_config_service()
+
+        # Cargar credenciales SMTP (None si el archivo no existe)
+        smtp_credentials = config_service.load_credentials()
+        if smtp_credentials is None:
+            return "No hay credenciales SMTP configuradas", None
+        if not smtp_credentials:
+            return "No se pudieron cargar las credenciales SMTP", None
+
+        # Cargar configuración de envío si no se proporciona
+        if not email_config:
+            email_config = config_service.load_email_send_config()
+
+        if not email_config or not email_config.get("enabled", False):
+            return "Configuracion de envio no esta habilitada", None
+
+        # Preparar datos del email
+        subject = email_config.get("subject", "Reporte de Registros de Bot - OpoBot")
+        recipient = email_config.get("recipient", "").strip()
+        cc_emails = email_config.get("cc", "").strip()
+
+        if not recipient:
+            return "No hay destinatario configurado", None
+
+        # Preparar lista de destinatarios
+        cc_list = []
+        if cc_emails:
+            cc_list = [email.strip() for email in cc_emails.split(',') if email.strip()]
+
+        return None, (smtp_credentials, subject, recipient, cc_list)
+
     def send_test_email(self, email_config):
         """
         Envía un email de prueba sin adjuntos
@@ -91,14 +330,12 @@ class EmailSendService:
             tuple: (success: bool, message: str)
         """
         try:
-            from services.config_service import ConfigService
-            config_service = ConfigService()
-
-            # Verificar credenciales SMTP
-            if not config_service.credentials_exist():
-                return False, "No hay credenciales SMTP configuradas"
+            config_service = _get_config_service()
 
+            # Cargar credenciales SMTP (None si el archivo no existe)
             smtp_credentials = config_service.load_credentials()
+            if smtp_credentials is None:
+                return False, "No hay credenciales SMTP configuradas"
             if not smtp_credentials:
                 return False, "No se pudieron cargar las credenciales SMTP"
 
@@ -247,12 +484,20 @@ class EmailSendService:
             file_path (Path): Ruta del archivo a adjuntar
         """
         try:
+            part = MIMEBase('application', 'octet-stream')
+
+            # Codificar en base64 directamente desde el archivo mapeado en memoria,
+            # sin cargar antes una copia completa de los bytes (mmap no admite
+            # archivos vacíos)
             with open(file_path, "rb") as attachment:
-                part = MIMEBase('application', 'octet-stream')
-                part.set_payload(attachment.read())
+                if file_path.stat().st_size:
+                    with mmap.mmap(attachment.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        encoded = base64.encodebytes(mapped)
+                else:
+                    encoded = b""
 
-            # Codificar archivo en base64
-            encoders.encode_base64(part)
+            part.set_payload(encoded.decode('ascii'))
+            part['Content-Transfer-Encoding'] = 'base64'
 
             # Añadir header
             filename = file_path.name
@@ -283,14 +528,37 @@ class EmailSendService:
             tuple: (success: bool, message: str)
         """
         try:
-            # Crear conexión SMTP
-            server = smtplib.SMTP(smtp_server, smtp_port, timeout=30)
-            server.starttls()  # Habilitar TLS
-            server.login(sender_email, sender_password)
-
-            # Enviar mensaje
-            server.send_message(message, to_addrs=recipients)
-            server.quit()
+            key = (smtp_server, smtp_port, sender_email)
+
+            # Reutilizar una conexión autenticada del pool si hay alguna viva
+            server = None
+            pooled = _POOL.acquire(key, sender_password)
+            if pooled is not None:
+                server, sent, opened_at = pooled
+                try:
+                    server.send_message(message, to_addrs=recipients)
+                except smtplib.SMTPServerDisconnected:
+                    # El servidor cerró la conexión entre el NOOP y el envío:
+                    # reintentar una vez con una conexión nueva
+                    _SmtpPool._quit(server)
+                    server = None
+                except Exception:
+                    _SmtpPool._quit(server)
+                    raise
+
+            if server is None:
+                server = self._open_smtp_connection(
+                    sender_email, sender_password, smtp_server, smtp_port
+                )
+                sent, opened_at = 0, time.monotonic()
+                try:
+                    server.send_message(message, to_addrs=recipients)
+                except Exception:
+                    _SmtpPool._quit(server)
+                    raise
+
+            # Dejar la conexión abierta para el siguiente envío
+            _POOL.release(key, server, sender_password, sent + 1, opened_at)
 
             return True, "Mensaje enviado correctamente"
 
@@ -319,6 +587,29 @@ class EmailSendService:
             error_msg = self._clean_string(str(e))
             return False, f"Error enviando mensaje: {error_msg}"
 
+    def _open_smtp_connection(self, sender_email, sender_password, smtp_server, smtp_port):
+        """
+        Abre una conexión SMTP nueva con TLS y autenticada
+
+        Args:
+            sender_email (str): Email del remitente
+            sender_password (str): Contraseña del remitente
+            smtp_server (str): Servidor SMTP
+            smtp_port (int): Puerto SMTP
+
+        Returns:
+            smtplib.SMTP: Conexión lista para enviar
+        """
+        server = _CachedDnsSMTP(smtp_server, smtp_port, timeout=30)
+        try:
+            server.starttls()  # Habilitar TLS
+            server.login(sender_email, sender_password)
+        except Exception:
+            _SmtpPool._quit(server)
+            raise
+
+        return server
+
     def _get_email_body(self):
         """
         Obtiene el cuerpo estándar del email para reportes
@@ -363,8 +654,7 @@ Bot de Gestión y Registros OpoBot"""
             dict: Estado de la configuración
         """
         try:
-            from services.config_service import ConfigService
-            config_service = ConfigService()
+            config_service = _get_config_service()
 
             # Verificar credenciales SMTP
             has_smtp = config_service.credentials_exist()
@@ -428,10 +718,13 @@ Bot de Gestión y Registros OpoBot"""
             # Validar CC si está presente
             cc_emails = email_config.get("cc", "").strip()
             if cc_emails:
-                cc_list = [email.strip() for email in cc_emails.split(',') if email.strip()]
-                for email in cc_list:
-                    if not self._validate_email_format(email):
-                        return False, f"Formato de CC invalido: {email}"
+                # Los tokens ya vienen sin espacios: aplicar el patrón directamente
+                # y quedarse con el primero que no lo cumpla
+                is_valid = _EMAIL_RE.match
+                cc_list = [email for email in map(str.strip, cc_emails.split(',')) if email]
+                invalid = next((email for email in cc_list if not is_valid(email)), None)
+                if invalid is not None:
+                    return False, f"Formato de CC invalido: {invalid}"
 
             return True, "Configuracion valida"
 
@@ -452,9 +745,7 @@ Bot de Gestión y Registros OpoBot"""
         if not email or not isinstance(email, str):
             return False
 
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email.strip()) is not None
+        return _EMAIL_RE.match(email.strip()) is not None
 
     def _clean_string(self, text):
         """
@@ -470,13 +761,14 @@ Bot de Gestión y Registros OpoBot"""
             return ""
 
         try:
-            # Reemplazar caracteres problemáticos comunes
             text = str(text)
-            text = text.replace('\xa0', ' ')  # Espacio no-rompible
-            text = text.replace('\u2019', "'")  # Apostrofe curvo
-            text = text.replace('\u2018', "'")  # Apostrofe curvo
-            text = text.replace('\u201c', '"')  # Comilla curva
-            text = text.replace('\u201d', '"')  # Comilla curva
+
+            # Texto ASCII puro: no hay nada que limpiar
+            if text.isascii():
+                return text
+
+            # Reemplazar caracteres problemáticos comunes
+            text = text.translate(self._TRANSLATE)
 
             # Codificar y decodificar para limpiar caracteres problemáticos
             return text.encode('ascii', 'ignore').decode('ascii')
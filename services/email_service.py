@@ -4,13 +4,26 @@ Servicio dedicado a manejar conexiones SMTP y pruebas de conectividad.
 Proporciona métodos para probar y validar configuraciones de email.
 """
 
+import re
 import smtplib
 import socket
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+# Formato básico de email; \Z evita aceptar un salto de línea final como hace $
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\Z')
+
 
 class EmailService:
+    # Reemplazos de caracteres problemáticos comunes (una sola pasada con str.translate)
+    _TRANSLATE = str.maketrans({
+        '\xa0': ' ',  # Espacio no-rompible
+        '\u2019': "'",  # Apostrofe curvo
+        '\u2018': "'",  # Apostrofe curvo
+        '\u201c': '"',  # Comilla curva
+        '\u201d': '"'  # Comilla curva
+    })
+
     def __init__(self):
         """Inicializa el servicio de email"""
         self.connection = None
@@ -135,9 +148,7 @@ Bot Python"""
         if not email:
             return False
 
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email.strip()) is not None
+        return _EMAIL_RE.match(email.strip()) is not None
 
     def get_common_smtp_settings(self, email_provider=None):
         """
@@ -275,12 +286,12 @@ Bot Python"""
             return ""
 
         try:
+            # Texto ASCII puro: no hay nada que limpiar
+            if text.isascii():
+                return text
+
             # Reemplazar caracteres problemáticos comunes
-            text = text.replace('\xa0', ' ')  # Espacio no-rompible
-            text = text.replace('\u2019', "'")  # Apostrofe curvo
-            text = text.replace('\u2018', "'")  # Apostrofe curvo
-            text = text.replace('\u201c', '"')  # Comilla curva
-            text = text.replace('\u201d', '"')  # Comilla curva
+            text = text.translate(self._TRANSLATE)
 
             # Codificar y decodificar para limpiar caracteres problemáticos
             return text.encode('ascii', 'ignore').decode('ascii')
@@ -5,6 +5,7 @@ Maneja la creación, edición, eliminación y persistencia de perfiles con crite
 """
 
 import json
+import unicodedata
 import uuid
 from pathlib import Path
 from datetime import datetime
@@ -51,7 +52,7 @@ class ProfileService:
 
             # Limpiar datos
             clean_name = self._clean_string(name.strip())
-            clean_search_title = self._clean_string(search_title.strip())
+            clean_search_title = self._clean_string(search_title.strip(), keep_accents=True)
 
             # Validaciones mejoradas para criterios flexibles
             if len(clean_name) < 2:
@@ -158,7 +159,7 @@ class ProfileService:
                 profiles[profile_index]["name"] = clean_name
 
             if search_title is not None:
-                clean_search_title = self._clean_string(search_title.strip()) if search_title.strip() else ""
+                clean_search_title = self._clean_string(search_title.strip(), keep_accents=True) if search_title.strip() else ""
 
                 if not clean_search_title:
                     raise Exception("El criterio de busqueda no puede estar vacio")
@@ -369,7 +370,7 @@ class ProfileService:
                     cleaned_profile = {}
                     for key, value in profile.items():
                         if isinstance(value, str):
-                            cleaned_profile[key] = self._clean_string(value)
+                            cleaned_profile[key] = self._clean_string(value, keep_accents=(key == "search_title"))
                         else:
                             cleaned_profile[key] = value
 
@@ -776,12 +777,13 @@ class ProfileService:
         except Exception:
             return False
 
-    def _clean_string(self, text):
+    def _clean_string(self, text, keep_accents=False):
         """
         Limpia un string de caracteres problemáticos para ASCII
 
         Args:
             text (str): Texto a limpiar
+            keep_accents (bool): Conservar letras no ASCII (títulos de búsqueda)
 
         Returns:
             str: Texto limpio
@@ -808,6 +810,9 @@ class ProfileService:
             for char, replacement in replacements.items():
                 text = text.replace(char, replacement)
 
+            if keep_accents:
+                return unicodedata.normalize('NFC', text)
+
             # Codificar y decodificar para limpiar caracteres problemáticos restantes
             return text.encode('ascii', 'ignore').decode('ascii')
 
@@ -0,0 +1,97 @@
+# tests/test_config_service.py
+"""
+Pruebas de las cachés de ConfigService, invalidadas por fecha de modificación
+y tamaño del archivo.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from services.config_service import ConfigService
+
+
+class ConfigCacheTest(unittest.TestCase):
+    CREDENTIALS = {"email": "bot@test", "password": "clave", "server": "smtp.test"}
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.config_dir = Path(self._temp_dir.name)
+        self.service = ConfigService(config_dir=self.config_dir)
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def rewrite(self, path, data, same_stat=False):
+        """Reescribe un archivo; con same_stat conserva su fecha y tamaño"""
+        stat = path.stat()
+        content = json.dumps(data, separators=(',', ':')).encode('ascii')
+        path.write_bytes(content)
+        if same_stat:
+            self.assertEqual(len(content), stat.st_size)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        else:
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_missing_files_return_none(self):
+        self.assertIsNone(self.service.load_credentials())
+        self.assertIsNone(self.service.load_email_send_config())
+
+    def test_credentials_are_read_once_while_file_is_unchanged(self):
+        self.service.save_credentials(self.CREDENTIALS)
+        self.assertEqual(self.service.load_credentials(), self.CREDENTIALS)
+
+        # Mismo tamaño y fecha: se devuelve la lectura anterior sin abrir el archivo
+        raw = json.loads(self.service.credentials_file.read_bytes())
+        self.rewrite(self.service.credentials_file, dict(raw, email="otr@test"), same_stat=True)
+
+        self.assertEqual(self.service.load_credentials()["email"], "bot@test")
+
+    def test_credentials_are_reloaded_when_file_changes(self):
+        self.service.save_credentials(self.CREDENTIALS)
+        self.service.load_credentials()
+
+        raw = json.loads(self.service.credentials_file.read_bytes())
+        self.rewrite(self.service.credentials_file, dict(raw, email="otro@test"))
+
+        self.assertEqual(self.service.load_credentials()["email"], "otro@test")
+
+    def test_cached_credentials_are_copies(self):
+        self.service.save_credentials(self.CREDENTIALS)
+        self.service.load_credentials()["email"] = "modificado@test"
+
+        self.assertEqual(self.service.load_credentials()["email"], "bot@test")
+
+    def test_save_and_delete_invalidate_credentials_cache(self):
+        self.service.save_credentials(self.CREDENTIALS)
+        self.service.load_credentials()
+
+        self.service.save_credentials(dict(self.CREDENTIALS, server="smtp.otro"))
+        self.assertEqual(self.service.load_credentials()["server"], "smtp.otro")
+
+        self.service.delete_credentials()
+        self.assertIsNone(self.service.load_credentials())
+
+    def test_email_send_config_is_reloaded_when_file_changes(self):
+        self.service.save_email_send_config({"enabled": True, "recipients": "a@test"})
+        self.assertEqual(self.service.load_email_send_config()["recipients"], "a@test")
+
+        self.rewrite(self.service.email_send_file, {"enabled": True, "recipients": "bb@test"})
+
+        self.assertEqual(self.service.load_email_send_config()["recipients"], "bb@test")
+
+    def test_restore_invalidates_credentials_cache(self):
+        self.service.save_credentials(self.CREDENTIALS)
+        backup_path = self.service.backup_credentials("respaldo.json")
+
+        self.service.save_credentials(dict(self.CREDENTIALS, email="nuevo@test"))
+        self.assertEqual(self.service.load_credentials()["email"], "nuevo@test")
+
+        self.service.restore_credentials(backup_path)
+        self.assertEqual(self.service.load_credentials()["email"], "bot@test")
+
+
+if __name__ == "__main__":
+    unittest.main()
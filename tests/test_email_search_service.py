@@ -0,0 +1,492 @@
+# tests/test_email_search_service.py
+"""
+Pruebas del conteo combinado de perfiles en EmailSearchService.
+Usan un buzón IMAP simulado en memoria que compara SUBJECT como indica
+RFC 3501 (subcadena sin distinguir mayúsculas).
+"""
+
+import imaplib
+import re
+import time
+import unittest
+from email.header import Header
+from unittest import mock
+
+from services.email_search_service import (
+    EmailSearchService, HEADER_FETCH, _ImapPool, _ResumableIMAP4_SSL, _SEARCH_CACHE,
+    _compact_seqset, _last_tokens, _split_seqset
+)
+
+_TOKEN_RE = re.compile(r'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()]+')
+_LITERAL_RE = re.compile(rb'\{(\d+)\+?\}\r\n')
+
+
+class _FakeImapConnection:
+    """
+    Conexión IMAP mínima: UID SEARCH (SUBJECT, SINCE, UID y OR), UID SEARCH RETURN
+    (COUNT / PARTIAL) de ESEARCH y UID FETCH de cabeceras
+    """
+
+    def __init__(self, subjects):
+        # UID -> asunto
+        self.messages = {uid: subject for uid, subject in enumerate(subjects, start=1)}
+        self.capabilities = ('IMAP4REV1',)
+        self.commands = []
+        self.reject = set()
+        self.literal = None
+        self.untagged_responses = {}
+        # Respuesta ESEARCH a devolver en lugar de la calculada (None: ninguna)
+        self.esearch_override = ...
+        # Enviar el UID en el cierre b')' en lugar de antes del literal
+        self.uid_in_trailer = False
+
+    def uid(self, command, *args):
+        self.commands.append((command, args[0]))
+        if command in self.reject:
+            return 'NO', [b'rechazado']
+
+        if command == 'FETCH':
+            return 'OK', self._fetch(args[0], args[1])
+
+        assert command == 'SEARCH'
+        return 'OK', [' '.join(self._search(args[-1])).encode('ascii')]
+
+    def _simple_command(self, name, *args):
+        assert (name, args[0], args[1]) == ('UID', 'SEARCH', 'RETURN')
+        self.commands.append(('SEARCH ' + args[2], args[-1]))
+        if 'SEARCH' in self.reject:
+            return 'NO', [b'rechazado']
+
+        found = self._search(args[-1])
+        if self.esearch_override is not ...:
+            response = self.esearch_override
+        elif args[2] == '(COUNT)':
+            response = f'(TAG "A1") UID COUNT {len(found)}'.encode('ascii')
+        else:
+            limit = int(args[2].rsplit('-', 1)[1].rstrip(')'))
+            response = f'(TAG "A1") UID PARTIAL ({args[2][9:-1]} {",".join(found[-limit:]) or "NIL"})'.encode('ascii')
+
+        if response is not None:
+            self.untagged_responses.setdefault('ESEARCH', []).append(response)
+        return 'OK', [b'SEARCH completado']
+
+    def _untagged_response(self, typ, dat, name):
+        # Igual que imaplib: [None] si el servidor no envió la respuesta
+        if name not in self.untagged_responses:
+            return typ, [None]
+        return typ, self.untagged_responses.pop(name)
+
+    def _search(self, criteria):
+        tokens = _TOKEN_RE.findall(self._wire_criteria(criteria))
+        matcher = self._parse_keys(tokens, None)
+        return [str(uid) for uid, subject in self.messages.items() if matcher(uid, subject)]
+
+    def _wire_criteria(self, criteria):
+        """Reconstruye el criterio recibido sustituyendo los literales por cadenas entrecomilladas"""
+        if isinstance(criteria, str):
+            return criteria
+
+        literal, self.literal = self.literal, None
+        while literal is not None and re.search(rb'\{\d+\}$', criteria):
+            criteria += b'\r\n' + literal(b'Ready')
+
+        text = ''
+        position = 0
+        for match in _LITERAL_RE.finditer(criteria):
+            if match.start() < position:
+                continue
+            end = match.end() + int(match.group(1))
+            value = criteria[match.end():end].decode('utf-8')
+            text += criteria[position:match.start()].decode('ascii') + '"' + value.replace('"', '\\"') + '"'
+            position = end
+        return text + criteria[position:].decode('ascii')
+
+    def _fetch(self, seqset, items):
+        response = []
+        for uid in sorted(self._parse_seqset(seqset.decode('ascii')) & self.messages.keys()):
+            header = f"Subject: {Header(self.messages[uid], 'utf-8').encode()}\r\n"
+            if items == HEADER_FETCH:
+                header += f"From: remitente{uid}@test\r\nDate: Mon, 1 Jan 2024 00:00:0{uid % 10} +0000\r\n"
+            header = (header + "\r\n").encode('ascii')
+
+            if self.uid_in_trailer:
+                response.append((f"{uid} (BODY[HEADER] {{{len(header)}}}".encode('ascii'), header))
+                response.append(f" UID {uid})".encode('ascii'))
+            else:
+                response.append((f"{uid} (UID {uid} BODY[HEADER] {{{len(header)}}}".encode('ascii'), header))
+                response.append(b')')
+        return response
+
+    @staticmethod
+    def _parse_seqset(seqset):
+        uids = set()
+        for part in seqset.split(','):
+            first, _, last = part.partition(':')
+            uids.update(range(int(first), int(last or first) + 1))
+        return uids
+
+    def _parse_keys(self, tokens, closing):
+        keys = []
+        while tokens and tokens[0] != closing:
+            keys.append(self._parse_key(tokens))
+        if closing:
+            tokens.pop(0)
+        return lambda uid, subject: all(key(uid, subject) for key in keys)
+
+    def _parse_key(self, tokens):
+        token = tokens.pop(0)
+        name = token.upper()
+
+        if token == '(':
+            return self._parse_keys(tokens, ')')
+        if name == 'OR':
+            left = self._parse_key(tokens)
+            right = self._parse_key(tokens)
+            return lambda uid, subject: left(uid, subject) or right(uid, subject)
+        if name == 'SINCE':
+            tokens.pop(0)
+            return lambda uid, subject: True
+        if name == 'SUBJECT':
+            term = re.sub(r'\\(.)', r'\1', tokens.pop(0)[1:-1]).lower()
+            return lambda uid, subject: term in subject.lower()
+        if name == 'UID':
+            uids = self._parse_seqset(tokens.pop(0))
+            return lambda uid, subject: uid in uids
+
+        raise ValueError(f"Criterio no soportado: {token}")
+
+
+class CountEmailsByGroupsTest(unittest.TestCase):
+    SUBJECTS = [
+        "Reporte diario",
+        "Reportes semanales",
+        "Alerta de Bot caido",
+        "Reporte de Alerta",
+        "Sin relacion",
+    ]
+
+    def setUp(self):
+        self.service = EmailSearchService()
+        self.service.connection = _FakeImapConnection(self.SUBJECTS)
+        self.service.current_key = ("imap.test", self.id())
+        _SEARCH_CACHE.clear_account(self.service.current_key)
+
+    def tearDown(self):
+        _SEARCH_CACHE.clear_account(("imap.test", self.id()))
+
+    def count(self, titles):
+        groups_list = [self.service._get_subject_groups(title) for title in titles]
+        return self.service._count_emails_by_groups(groups_list)
+
+    def test_profile_count_does_not_depend_on_other_profiles(self):
+        alone = self.count(["Reporte"])
+        combined = self.count(["Reporte", "Alerta Bot", "Reportes"])
+
+        self.assertEqual(alone, [3])
+        self.assertEqual(combined[0], alone[0])
+        self.assertEqual(combined, [3, 1, 1])
+
+    def test_combined_count_uses_one_search_and_one_fetch(self):
+        self.count(["Reporte", "Alerta Bot", "Reportes"])
+
+        self.assertEqual([command for command, _ in self.service.connection.commands],
+                         ['SEARCH', 'FETCH'])
+
+    def test_no_union_matches_returns_zero_for_every_profile(self):
+        self.assertEqual(self.count(["Factura", "Pedido"]), [0, 0])
+        self.assertEqual(len(self.service.connection.commands), 1)
+
+    def test_rejected_fetch_is_an_error_not_zero(self):
+        self.service.connection.reject.add('FETCH')
+
+        with self.assertRaises(imaplib.IMAP4.error):
+            self.count(["Reporte", "Alerta Bot"])
+
+    def test_multiple_profiles_report_errors_instead_of_zero(self):
+        service = self.service
+        service.connection.reject.add('SEARCH')
+        profiles = [
+            {"id": "a", "name": "A", "search_title": "Reporte"},
+            {"id": "b", "name": "B", "search_title": "Alerta Bot"},
+        ]
+
+        with mock.patch.object(service, '_connect_imap', return_value=(True, "ok")):
+            results = service.search_multiple_profiles(profiles, {})
+
+        self.assertFalse(results["a"]["success"])
+        self.assertFalse(results["b"]["success"])
+
+    def test_long_uid_sets_are_fetched_in_several_commands(self):
+        self.service.connection.messages = {
+            uid: "Reporte" for uid in range(1, 40, 2)
+        }
+        self.service.MAX_UID_SET_LENGTH = 12
+
+        self.assertEqual(self.count(["Reporte", "Alerta"]), [20, 0])
+        fetches = [seqset for command, seqset in self.service.connection.commands if command == 'FETCH']
+        self.assertGreater(len(fetches), 1)
+        self.assertTrue(all(len(seqset) <= 12 for seqset in fetches))
+
+    def test_accented_titles_are_searched_as_utf8_literals(self):
+        connection = self.service.connection
+        connection.messages = {1: "Notificación diaria", 2: "Notificacion diaria", 3: "Canción"}
+        connection.capabilities = ('IMAP4REV1', 'LITERAL+')
+
+        self.assertEqual(self.count(["Notificación", "Canción diaria"]), [1, 0])
+        self.assertIsNone(connection.literal)
+
+    def test_accented_titles_use_continuations_without_literal_plus(self):
+        self.service.connection.messages = {1: "Año nuevo", 2: "Informe Año", 3: "Ano nuevo"}
+
+        command, *arguments = self.service._search_arguments('(SUBJECT "Año" SUBJECT "nuevo")')
+
+        self.assertEqual(command, 'CHARSET')
+        self.assertEqual(arguments, ['UTF-8', b'(SUBJECT {4}'])
+        self.assertEqual(self.service.connection.literal(b'Ready'), 'Año'.encode('utf-8') + b' SUBJECT "nuevo")')
+        self.assertEqual(self.count(["Año"]), [2])
+
+    def test_ascii_criteria_are_sent_unchanged(self):
+        self.assertEqual(self.service._search_arguments('(SUBJECT "Reporte")'), (None, '(SUBJECT "Reporte")'))
+        self.assertIsNone(self.service.connection.literal)
+
+
+class ESearchTest(unittest.TestCase):
+    SUBJECTS = ["Reporte %d" % number for number in range(1, 8)] + ["Otro asunto"]
+    CRITERIA = '(SUBJECT "Reporte" SINCE "01-Jan-2024")'
+
+    def setUp(self):
+        self.service = EmailSearchService()
+        self.connection = _FakeImapConnection(self.SUBJECTS)
+        self.connection.capabilities = ('IMAP4REV1', 'ESEARCH', 'PARTIAL')
+        self.service.connection = self.connection
+        self.service.current_key = ("imap.test", self.id())
+        _SEARCH_CACHE.clear_account(self.service.current_key)
+
+    def tearDown(self):
+        _SEARCH_CACHE.clear_account(("imap.test", self.id()))
+
+    def commands(self):
+        return [command for command, _ in self.connection.commands]
+
+    def test_count_only_transfers_the_total(self):
+        self.assertEqual(self.service._count_search(self.CRITERIA), 7)
+        self.assertEqual(self.commands(), ['SEARCH (COUNT)'])
+
+    def test_count_of_zero_matches(self):
+        self.assertEqual(self.service._count_search('(SUBJECT "Factura")'), 0)
+        self.assertEqual(self.commands(), ['SEARCH (COUNT)'])
+
+    def test_count_falls_back_to_search_without_esearch_response(self):
+        self.connection.esearch_override = None
+
+        self.assertEqual(self.service._count_search(self.CRITERIA), 7)
+        self.assertEqual(self.commands(), ['SEARCH (COUNT)', 'SEARCH'])
+
+    def test_count_falls_back_to_search_on_malformed_response(self):
+        self.connection.esearch_override = b'(TAG "A1") UID MIN 1 MAX 7'
+
+        self.assertEqual(self.service._count_search(self.CRITERIA), 7)
+        self.assertEqual(self.commands(), ['SEARCH (COUNT)', 'SEARCH'])
+
+    def test_count_falls_back_to_search_when_rejected(self):
+        self.connection.reject.add('SEARCH')
+
+        self.assertIsNone(self.service._esearch_count(self.CRITERIA, None))
+
+    def test_partial_returns_last_uids_in_order(self):
+        self.assertEqual(self.service._search_last_uids(self.CRITERIA, 3), [b'5', b'6', b'7'])
+        self.assertEqual(self.commands(), ['SEARCH (PARTIAL -1:-3)'])
+
+    def test_partial_expands_ranges_in_any_order(self):
+        self.connection.esearch_override = b'(TAG "A1") UID PARTIAL (-1:-4 7:6,2,4)'
+
+        self.assertEqual(self.service._esearch_partial(self.CRITERIA, 4), [b'2', b'4', b'6', b'7'])
+
+    def test_partial_nil_means_no_matches(self):
+        self.assertEqual(self.service._search_last_uids('(SUBJECT "Factura")', 5), [])
+        self.assertEqual(self.commands(), ['SEARCH (PARTIAL -1:-5)'])
+
+    def test_partial_falls_back_to_search_without_esearch_response(self):
+        self.connection.esearch_override = None
+
+        self.assertEqual(self.service._search_last_uids(self.CRITERIA, 2), [b'6', b'7'])
+        self.assertEqual(self.commands(), ['SEARCH (PARTIAL -1:-2)', 'SEARCH'])
+
+    def test_partial_falls_back_to_search_on_malformed_response(self):
+        self.connection.esearch_override = b'(TAG "A1") UID PARTIAL (-1:-2 6:x)'
+
+        self.assertEqual(self.service._search_last_uids(self.CRITERIA, 2), [b'6', b'7'])
+        self.assertEqual(self.commands(), ['SEARCH (PARTIAL -1:-2)', 'SEARCH'])
+
+
+class SeqsetHelpersTest(unittest.TestCase):
+
+    def test_compact_seqset_joins_consecutive_uids(self):
+        self.assertEqual(_compact_seqset([b'1', b'3', b'4', b'5', b'7', b'9', b'10']), b'1,3:5,7,9:10')
+        self.assertEqual(_compact_seqset([b'42']), b'42')
+
+    def test_split_seqset_respects_max_length(self):
+        chunks = _split_seqset(b'1,3:5,7,9:10,12', 7)
+
+        self.assertEqual(b','.join(chunks), b'1,3:5,7,9:10,12')
+        self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+
+    def test_last_tokens(self):
+        self.assertEqual(_last_tokens(b'1 2 3 4', 2), [b'3', b'4'])
+        self.assertEqual(_last_tokens(b'1 2', 5), [b'1', b'2'])
+        self.assertEqual(_last_tokens(b'17', 1), [b'17'])
+
+
+class FetchEmailHeadersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = EmailSearchService()
+        self.connection = _FakeImapConnection(["Primero", "Segundo", "Tercero"])
+        self.service.connection = self.connection
+
+    def test_headers_are_matched_by_uid_before_literal(self):
+        emails = self.service._fetch_email_headers([b'1', b'3'])
+
+        self.assertEqual([email["message_id"] for email in emails], ['1', '3'])
+        self.assertEqual([email["subject"] for email in emails], ['Primero', 'Tercero'])
+        self.assertEqual(emails[1]["sender"], 'remitente3@test')
+
+    def test_headers_are_matched_by_uid_in_trailer(self):
+        self.connection.uid_in_trailer = True
+
+        emails = self.service._fetch_email_headers([b'2', b'3'])
+
+        self.assertEqual([(email["message_id"], email["subject"]) for email in emails],
+                         [('2', 'Segundo'), ('3', 'Tercero')])
+
+    def test_missing_messages_are_skipped(self):
+        self.connection.messages.pop(2)
+
+        emails = self.service._fetch_email_headers([b'1', b'2', b'3'])
+        self.assertEqual([email["message_id"] for email in emails], ['1', '3'])
+
+    def test_rejected_fetch_returns_empty_list(self):
+        self.connection.reject.add('FETCH')
+
+        self.assertEqual(self.service._fetch_email_headers([b'1']), [])
+
+
+class _PooledImap:
+    """Conexión IMAP simulada para el pool: NOOP configurable y registro de logout"""
+
+    def __init__(self, noop='OK'):
+        self.noop_result = noop
+        self.logged_out = False
+
+    def noop(self):
+        if isinstance(self.noop_result, Exception):
+            raise self.noop_result
+        return self.noop_result, [b'']
+
+    def logout(self):
+        self.logged_out = True
+
+
+class ImapPoolTest(unittest.TestCase):
+    KEY = ("imap.test", "bot@test")
+
+    def setUp(self):
+        self.pool = _ImapPool(max_per_account=2)
+
+    def test_empty_pool_returns_none(self):
+        self.assertIsNone(self.pool.acquire(self.KEY, "clave"))
+
+    def test_released_connection_is_reused(self):
+        connection = _PooledImap()
+        self.pool.release(self.KEY, connection, "clave")
+
+        self.assertIs(self.pool.acquire(self.KEY, "clave"), connection)
+        self.assertIsNone(self.pool.acquire(self.KEY, "clave"))
+
+    def test_password_change_discards_connection(self):
+        connection = _PooledImap()
+        self.pool.release(self.KEY, connection, "anterior")
+
+        self.assertIsNone(self.pool.acquire(self.KEY, "nueva"))
+        self.assertTrue(connection.logged_out)
+
+    def test_idle_timeout_discards_connection(self):
+        connection = _PooledImap()
+        self.pool.release(self.KEY, connection, "clave")
+
+        with mock.patch('services.email_search_service.time.monotonic',
+                        return_value=time.monotonic() + _ImapPool.IDLE_TIMEOUT + 1):
+            self.assertIsNone(self.pool.acquire(self.KEY, "clave"))
+        self.assertTrue(connection.logged_out)
+
+    def test_dead_connection_is_skipped_for_next_one(self):
+        alive = _PooledImap()
+        dead = _PooledImap(noop=imaplib.IMAP4.abort("conexion cerrada"))
+        self.pool.release(self.KEY, alive, "clave")
+        self.pool.release(self.KEY, dead, "clave")
+
+        self.assertIs(self.pool.acquire(self.KEY, "clave"), alive)
+        self.assertTrue(dead.logged_out)
+
+    def test_extra_connections_are_closed_on_release(self):
+        connections = [_PooledImap() for _ in range(3)]
+        for connection in connections:
+            self.pool.release(self.KEY, connection, "clave")
+
+        self.assertEqual([connection.logged_out for connection in connections], [False, False, True])
+
+    def test_accounts_do_not_share_connections(self):
+        self.pool.release(self.KEY, _PooledImap(), "clave")
+
+        self.assertIsNone(self.pool.acquire(("imap.test", "otro@test"), "clave"))
+
+
+class _SelectOnlyImap(_ResumableIMAP4_SSL):
+    """_ResumableIMAP4_SSL sin socket: SELECT devuelve las respuestas indicadas"""
+
+    def __init__(self, select_responses):
+        self.capabilities = ('IMAP4REV1', 'CONDSTORE')
+        self.untagged_responses = {}
+        self.mailbox_version = None
+        self.select_responses = select_responses
+        self.commands = []
+
+    def select(self, mailbox='INBOX', readonly=False):
+        self.commands.append('SELECT')
+        self.untagged_responses = {name: list(values) for name, values in self.select_responses.items()}
+        return 'OK', self.untagged_responses.get('EXISTS', [None])
+
+    def status(self, mailbox, names):
+        raise AssertionError("STATUS sobre el buzón seleccionado")
+
+
+class MailboxVersionTest(unittest.TestCase):
+    RESPONSES = {'EXISTS': [b'5'], 'UIDVALIDITY': [b'7'], 'HIGHESTMODSEQ': [b'100']}
+
+    def setUp(self):
+        self.connection = _SelectOnlyImap(self.RESPONSES)
+        self.connection.select_inbox()
+        self.service = EmailSearchService()
+        self.service.connection = self.connection
+
+    def test_version_comes_from_select_response(self):
+        self.assertEqual(self.service._get_mailbox_version(), (b'7', b'100'))
+        self.assertEqual(self.connection.commands, ['SELECT'])
+
+    def test_changes_since_select_trigger_a_new_select(self):
+        self.connection.untagged_responses['EXISTS'] = [b'6']
+        self.connection.select_responses = dict(self.RESPONSES, HIGHESTMODSEQ=[b'104'])
+
+        self.assertEqual(self.service._get_mailbox_version(), (b'7', b'104'))
+        self.assertEqual(self.connection.commands, ['SELECT', 'SELECT'])
+        self.assertFalse(self.connection.mailbox_changed())
+
+    def test_nomodseq_has_no_version(self):
+        self.connection.select_responses = {'EXISTS': [b'5'], 'UIDVALIDITY': [b'7'], 'NOMODSEQ': [None]}
+        self.connection.select_inbox()
+
+        self.assertIsNone(self.service._get_mailbox_version())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_email_send_service.py
+"""
+Pruebas del pool de conexiones SMTP de EmailSendService.
+Usan conexiones simuladas que registran NOOP y QUIT sin abrir sockets.
+"""
+
+import smtplib
+import time
+import unittest
+from unittest import mock
+
+from services.email_send_service import _SmtpPool
+
+
+class _PooledSmtp:
+    """Conexión SMTP simulada: NOOP configurable y registro de QUIT"""
+
+    def __init__(self, noop=250):
+        self.noop_result = noop
+        self.closed = False
+
+    def noop(self):
+        if isinstance(self.noop_result, Exception):
+            raise self.noop_result
+        return self.noop_result, b'OK'
+
+    def quit(self):
+        self.closed = True
+
+
+class SmtpPoolTest(unittest.TestCase):
+    KEY = ("smtp.test", 587, "bot@test")
+
+    def setUp(self):
+        self.pool = _SmtpPool(max_per_account=2)
+
+    def test_empty_pool_returns_none(self):
+        self.assertIsNone(self.pool.acquire(self.KEY, "clave"))
+
+    def test_released_connection_keeps_its_counters(self):
+        server = _PooledSmtp()
+        opened_at = time.monotonic()
+        self.pool.release(self.KEY, server, "clave", 3, opened_at)
+
+        self.assertEqual(self.pool.acquire(self.KEY, "clave"), (server, 3, opened_at))
+        self.assertIsNone(self.pool.acquire(self.KEY, "clave"))
+
+    def test_password_change_discards_connection(self):
+        server = _PooledSmtp()
+        self.pool.release(self.KEY, server, "anterior", 0, time.monotonic())
+
+        self.assertIsNone(self.pool.acquire(self.KEY, "nueva"))
+        self.assertTrue(server.closed)
+
+    def test_noop_failure_discards_connection(self):
+        alive = _PooledSmtp()
+        refused = _PooledSmtp(noop=421)
+        disconnected = _PooledSmtp(noop=smtplib.SMTPServerDisconnected("cerrada"))
+        for server in (alive, refused):
+            self.pool.release(self.KEY, server, "clave", 0, time.monotonic())
+
+        self.assertIs(self.pool.acquire(self.KEY, "clave")[0], alive)
+        self.assertTrue(refused.closed)
+
+        self.pool.release(self.KEY, disconnected, "clave", 0, time.monotonic())
+        self.assertIsNone(self.pool.acquire(self.KEY, "clave"))
+        self.assertTrue(disconnected.closed)
+
+    def test_connection_is_renewed_after_max_messages(self):
+        server = _PooledSmtp()
+        self.pool.release(self.KEY, server, "clave", _SmtpPool.MAX_MESSAGES, time.monotonic())
+
+        self.assertTrue(server.closed)
+        self.assertIsNone(self.pool.acquire(self.KEY, "clave"))
+
+    def test_connection_is_renewed_after_max_age(self):
+        server = _PooledSmtp()
+        self.pool.release(self.KEY, server, "clave", 1, time.monotonic() - _SmtpPool.MAX_AGE - 1)
+
+        self.assertTrue(server.closed)
+
+    def test_idle_timeout_discards_connection(self):
+        server = _PooledSmtp()
+        self.pool.release(self.KEY, server, "clave", 0, time.monotonic())
+
+        with mock.patch('services.email_send_service.time.monotonic',
+                        return_value=time.monotonic() + _SmtpPool.IDLE_TIMEOUT + 1):
+            self.assertIsNone(self.pool.acquire(self.KEY, "clave"))
+        self.assertTrue(server.closed)
+
+    def test_close_all_quits_idle_connections(self):
+        servers = [_PooledSmtp(), _PooledSmtp()]
+        for server in servers:
+            self.pool.release(self.KEY, server, "clave", 0, time.monotonic())
+
+        self.pool.close_all()
+
+        self.assertTrue(all(server.closed for server in servers))
+        self.assertIsNone(self.pool.acquire(self.KEY, "clave"))
+
+
+if __name__ == "__main__":
+    unittest.main()